@@ -0,0 +1,61 @@
+"""Compare scoring tickets one predict_frame call at a time with the MicroBatcher.
+
+Needs a trained model in models/ (run from the project root).
+
+Usage: python benchmarks/bench_micro_batch.py --tickets 2000 --concurrency 200 --max-batch-size 64
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from batcher import MicroBatcher
+from classifier import ServiceTagClassifier
+from bench_preprocess import make_tickets
+
+async def stream(batcher, rows, concurrency):
+    """Score rows as a live stream with at most `concurrency` tickets in flight"""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(row):
+        async with limit:
+            return await batcher.predict(row)
+
+    return await asyncio.gather(*(one(row) for row in rows))
+
+async def run_batched(classifier, rows, args):
+    async with MicroBatcher(classifier, args.max_batch_size, args.max_wait_ms) as batcher:
+        start = time.perf_counter()
+        tags = await stream(batcher, rows, args.concurrency)
+        elapsed = time.perf_counter() - start
+    return tags, elapsed, batcher.metrics()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched single-ticket scoring")
+    parser.add_argument("--tickets", type=int, default=2000, help="Number of synthetic tickets")
+    parser.add_argument("--concurrency", type=int, default=200, help="Tickets in flight at once")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    classifier = ServiceTagClassifier()
+    if classifier.load_model() is None:
+        sys.exit(1)
+    rows = make_tickets(args.tickets).to_dict("records")
+
+    start = time.perf_counter()
+    single = [classifier.predict_frame(pd.DataFrame([row], dtype=object))["Predicted_Service_Tag"].iloc[0]
+              for row in rows]
+    one_by_one = time.perf_counter() - start
+
+    batched, elapsed, metrics = asyncio.run(run_batched(classifier, rows, args))
+
+    print(f"tickets: {args.tickets}, concurrency: {args.concurrency}")
+    print(f"one at a time: {one_by_one:.3f}s ({args.tickets / one_by_one:.0f} tickets/s)")
+    print(f"micro-batched: {elapsed:.3f}s ({args.tickets / elapsed:.0f} tickets/s), "
+          f"mean batch {metrics['mean_batch_size']}, latency {metrics.get('latency_ms')}")
+    print(f"speedup: {one_by_one / elapsed:.1f}x, identical output: {single == list(batched)}")
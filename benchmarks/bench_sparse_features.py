@@ -0,0 +1,74 @@
+"""Compare the sparse training features from build_pipeline() with the old dense one-hot build.
+
+Usage: python benchmarks/bench_sparse_features.py --rows 200000 --trees 20
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import OneHotEncoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from classifier import ServiceTagClassifier
+from bench_preprocess import make_tickets
+
+def dense_preprocessor():
+    """The previous ColumnTransformer: dense one-hot block, no rare-category pooling"""
+    return ColumnTransformer(
+        transformers=[
+            ('desc', TfidfVectorizer(max_features=500, ngram_range=(1, 2), stop_words='english'),
+             'Short description'),
+            ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=False),
+             ['Assignment group', 'Configuration item', 'Business Unit', 'Item'])
+        ],
+        remainder='drop'
+    )
+
+def matrix_bytes(X):
+    if sparse.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+def measure(name, preprocessor, forest, X, y):
+    tracemalloc.start()
+    start = time.perf_counter()
+    features = preprocessor.fit_transform(X)
+    transform_time = time.perf_counter() - start
+    _, transform_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    forest.fit(features, y)
+    fit_time = time.perf_counter() - start
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name}: shape={features.shape} matrix={matrix_bytes(features) / 1e6:.1f}MB "
+          f"transform={transform_time:.2f}s (peak {transform_peak / 1e6:.0f}MB) "
+          f"fit={fit_time:.2f}s (peak {fit_peak / 1e6:.0f}MB)")
+    return forest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dense vs sparse training features")
+    parser.add_argument("--rows", type=int, default=200000, help="Number of synthetic tickets")
+    parser.add_argument("--trees", type=int, default=20, help="Trees to fit on each feature matrix")
+    args = parser.parse_args()
+
+    classifier = ServiceTagClassifier()
+    df = classifier.preprocess_data(make_tickets(args.rows))
+    X = df[classifier.features]
+    y = np.random.default_rng(1).choice(["SIP", "IFS", "CF", "MVM", "AUTO", "IW"], len(df))
+
+    pipeline = classifier.build_pipeline()
+    forest = pipeline.named_steps['classifier'].set_params(n_estimators=args.trees, verbose=0)
+
+    print(f"rows: {args.rows}, trees: {args.trees}")
+    measure("dense ", dense_preprocessor(), clone(forest), X, y)
+    measure("sparse", pipeline.named_steps['preprocessor'], clone(forest), X, y)
@@ -0,0 +1,142 @@
+"""Time every report stage on synthetic exports and keep the results as JSON.
+
+Stages: load, preprocess_data, predict, _apply_business_rules,
+generate_service_summary, each chart and generate_ppt. Everything runs in a
+temporary working directory with a model trained on synthetic tickets
+(or a copy of --models). Pass an earlier results file as --baseline to
+fail when a stage got slower than --tolerance times its baseline.
+
+Usage: python benchmarks/bench_stages.py --rows 10000 100000 1000000 --output stages.json
+       python benchmarks/bench_stages.py --baseline stages.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from classifier import ServiceTagClassifier
+from utils.charts import (generate_monthly_progress, generate_total_donut, generate_urgency_heatmap,
+                          generate_volume_bar_chart)
+from utils.data_to_json import generate_service_summary
+from utils.visualization import generate_ppt
+from synthetic import make_export, make_labeled
+
+# Stages faster than this are too noisy to flag as regressions
+MIN_SECONDS = 0.05
+
+def timed(stages, name, rows, func, *args, verbose=False):
+    """Run func(*args), record wall/CPU seconds under name and return its result"""
+    output = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start, cpu = time.perf_counter(), time.process_time()
+        result = func(*args)
+        seconds, cpu_seconds = time.perf_counter() - start, time.process_time() - cpu
+    stages[name] = {"seconds": round(seconds, 4), "cpu_seconds": round(cpu_seconds, 4), "rows": rows}
+    print(f"  {name:<28} {seconds:8.3f}s")
+    return result
+
+def prepare_model(models, train_rows, verbose):
+    """Copy an existing models directory, or train one on synthetic labeled tickets"""
+    if models:
+        shutil.copytree(models, "models")
+        return
+    make_labeled(train_rows, seed=1).to_csv("train.csv", index=False)
+    print(f"Training a model on {train_rows} synthetic tickets...")
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        ServiceTagClassifier(n_jobs=-1).train("train.csv")
+
+def run_size(rows, start_date, end_date, verbose):
+    """Time every stage on one synthetic export of `rows` tickets"""
+    stages = {}
+    make_export(rows).to_csv("export.csv", index=False)
+    classifier = ServiceTagClassifier()
+    classifier.load_model()
+
+    df = timed(stages, "load", rows, classifier._load_csv_with_fallback, "export.csv", verbose=verbose)
+    df = timed(stages, "preprocess_data", rows, classifier.preprocess_data, df, verbose=verbose)
+    tags = timed(stages, "predict", rows, classifier._predict_unique, df[classifier.features], verbose=verbose)
+    df["Predicted_Service_Tag"] = tags[0]
+    timed(stages, "_apply_business_rules", rows, classifier._apply_business_rules, df, verbose=verbose)
+    df.to_csv("predictions.csv", index=False)
+
+    summary = timed(stages, "generate_service_summary", rows, generate_service_summary, "predictions.csv",
+                    "data/processed/service_summary.json", start_date, end_date, verbose=verbose)
+    data = summary.get("services", {})
+    charts = Path("data/charts")
+    charts.mkdir(parents=True, exist_ok=True)
+    # cache_dir=None so every chart is really drawn
+    timed(stages, "chart:volume_by_service", rows, generate_volume_bar_chart, data, charts, None, verbose=verbose)
+    timed(stages, "chart:urgency_heatmap", rows, generate_urgency_heatmap, data, charts, ("INC", "RITM"), None,
+          verbose=verbose)
+    timed(stages, "chart:monthly_progress", rows, generate_monthly_progress, df, charts, None, verbose=verbose)
+    timed(stages, "chart:donut_total", rows, generate_total_donut, data, charts, None, verbose=verbose)
+    timed(stages, "generate_ppt", rows, generate_ppt, "data/processed/service_summary.json", "data/reports",
+          verbose=verbose)
+    return stages
+
+def compare(results, baseline, tolerance):
+    """Stages slower than tolerance x baseline, as printable lines"""
+    regressions = []
+    for rows, size in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(rows, {})
+        for name, stage in size.items():
+            before = base.get(name, {}).get("seconds")
+            if before is None or max(before, stage["seconds"]) < MIN_SECONDS:
+                continue
+            if stage["seconds"] > before * tolerance:
+                regressions.append(f"{rows} rows {name}: {stage['seconds']:.3f}s vs {before:.3f}s "
+                                   f"({stage['seconds'] / before:.2f}x)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every report stage on synthetic tickets")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="Export sizes to time")
+    parser.add_argument("--train-rows", type=int, default=20000, help="Synthetic tickets to train the model on")
+    parser.add_argument("--models", help="Use a copy of this trained models directory instead of training one")
+    parser.add_argument("--start-date", default="2025-06-23", help="Summary period start (synthetic data ends 2025-06-30)")
+    parser.add_argument("--end-date", default="2025-06-30", help="Summary period end")
+    parser.add_argument("--output", default=f"bench_stages_{datetime.now():%Y%m%d_%H%M%S}.json", help="Results JSON")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown factor against --baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show the stages' own output")
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve()
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    models = Path(args.models).resolve() if args.models else None
+
+    results = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "train_rows": None if models else args.train_rows,
+        },
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        prepare_model(models, args.train_rows, args.verbose)
+        for rows in args.rows:
+            print(f"{rows} rows:")
+            results["sizes"][str(rows)] = run_size(rows, args.start_date, args.end_date, args.verbose)
+        os.chdir(output.parent)
+
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results saved to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        sys.exit(1 if regressions else 0)
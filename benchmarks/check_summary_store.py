@@ -0,0 +1,92 @@
+"""Check that the counter and summary store paths give the same summary as build_service_summary.
+
+A synthetic export (a third of the timestamps with sub-second parts from
+Excel serials, services in random row order) is summarized for several date ranges
+directly from the tickets, from count_tickets() counters (whole and in
+chunks) and through a SummaryStore. Apart from generated_at and
+source_file the JSON must be identical, key order included.
+
+Usage: python benchmarks/check_summary_store.py [--rows 20000] [--chunksize 3000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from utils.dates import parse_dates
+from utils.data_to_json import SummaryStore, build_service_summary, combine_counts, count_tickets, summary_from_counts
+from synthetic import EXCEL_EPOCH, SERVICE_TAGS, make_export
+
+RANGES = [
+    ("2025-06-01", "2025-06-30"),
+    ("2025-06-23", "2025-06-29"),
+    ("2025-03-15", "2025-03-15"),
+    ("2025-05-01", None),
+    (None, None),
+]
+
+def canonical(summary):
+    """The summary as JSON text without the fields that differ between runs"""
+    summary = {key: value for key, value in summary.items() if key not in ("generated_at", "source_file")}
+    return json.dumps(summary, indent=2)
+
+def predictions(rows, seed):
+    """make_export() with a third of the timed tickets moved to Excel serials with sub-second parts"""
+    df = make_export(rows, seed)
+    rng = np.random.default_rng(seed)
+    df["Predicted_Service_Tag"] = rng.choice(SERVICE_TAGS + ["MISSING"], rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        created = parse_dates(df["Created"])
+    excel = (rng.random(rows) < 0.3) & (created != created.dt.normalize()).to_numpy()
+    serials = (created[excel] - EXCEL_EPOCH) / pd.Timedelta(days=1) + rng.random(excel.sum()) / 86400
+    df.loc[excel, "Created"] = [f"{serial:.9f}" for serial in serials]
+    return df
+
+def chunked_counts(df, chunksize):
+    counts = None
+    for offset in range(0, len(df), chunksize):
+        chunk_counts = count_tickets(df.iloc[offset:offset + chunksize], offset=offset)
+        counts = chunk_counts if counts is None else combine_counts([counts, chunk_counts])
+    return counts
+
+def check(df, start_date, end_date, chunksize, store_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = canonical(build_service_summary(df, start_date, end_date))
+        results = {
+            "counts": summary_from_counts(count_tickets(df), start_date, end_date),
+            "chunked counts": summary_from_counts(chunked_counts(df, chunksize), start_date, end_date),
+        }
+        if start_date:
+            store = SummaryStore(Path(store_dir) / f"{start_date}_{end_date}.sqlite")
+            store.update(count_tickets(df), start_date, end_date)
+            results["store"] = store.summary(start_date, end_date)
+
+    ok = True
+    for name, summary in results.items():
+        if canonical(summary) != expected:
+            print(f"[FAIL] {start_date} to {end_date}: {name} summary differs from build_service_summary")
+            ok = False
+    if ok:
+        print(f"[OK] {start_date} to {end_date}: {', '.join(results)} match build_service_summary")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the counter and store summaries with build_service_summary")
+    parser.add_argument("--rows", type=int, default=20000, help="Number of synthetic tickets")
+    parser.add_argument("--chunksize", type=int, default=3000, help="Chunk size for the chunked counters")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = predictions(args.rows, args.seed)
+    with tempfile.TemporaryDirectory() as store_dir:
+        results = []
+        for start_date, end_date in RANGES:
+            results.append(check(df, start_date, end_date, args.chunksize, store_dir))
+    sys.exit(0 if all(results) else 1)
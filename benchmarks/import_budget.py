@@ -0,0 +1,84 @@
+"""Check the startup import cost of the CLI entry points against a budget.
+
+Every entry point is run as `python -X importtime <script> --help`, so only
+module-level imports are counted. The script fails when an entry point
+imports a module that should only load on demand, or is over its budget.
+pandas alone takes most of the startup time and varies from machine to
+machine, so for scripts that load it the budget covers the time on top of a
+bare `import pandas` measured in the same run. Each time is the best of
+--repeat runs.
+
+Usage: python benchmarks/import_budget.py [--scale 1.5] [--top 5] [--repeat 3]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ["sklearn", "scipy", "matplotlib", "seaborn"]
+
+# script: (budget in ms over `import pandas` if the script loads pandas, modules that must not load at startup)
+BUDGETS = {
+    "src/classifier.py": (150, HEAVY),
+    "src/pipeline.py": (400, HEAVY),
+    "src/server.py": (250, HEAVY),
+    "src/utils/data_to_json.py": (150, HEAVY + ["pptx"]),
+    "src/utils/charts.py": (150, HEAVY),
+    "src/utils/visualization.py": (500, HEAVY),
+    "src/processing/split_predictions.py": (150, HEAVY),
+}
+
+def import_times(args, label):
+    """(module, self us, cumulative us, depth) for every import `python args` does at startup"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"{label} failed:\n{result.stderr.splitlines()[-1]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def total_ms(rows):
+    return sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+
+def best_run(args, label, repeat):
+    """Rows of the fastest of `repeat` runs"""
+    return min((import_times(args, label) for _ in range(repeat)), key=total_ms)
+
+def check(script, budget_ms, forbidden, top, pandas_ms, repeat):
+    rows = best_run([script, "--help"], f"{script} --help", repeat)
+    loaded = {name for name, _, _, _ in rows}
+    leaked = [module for module in forbidden if module in loaded]
+    baseline_ms = pandas_ms if "pandas" in loaded else 0.0
+    spent_ms = total_ms(rows) - baseline_ms
+    ok = spent_ms <= budget_ms and not leaked
+
+    over = " over pandas" if baseline_ms else ""
+    print(f"[{'OK' if ok else 'FAIL'}] {script}: {spent_ms:.0f}ms{over} (budget {budget_ms:.0f}ms)")
+    for name, _, cumulative, _ in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:top]:
+        print(f"    {cumulative / 1000:8.1f}ms  {name}")
+    if leaked:
+        print(f"    imported at startup: {', '.join(leaked)}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check CLI import times against the budget")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per script; the fastest one counts")
+    args = parser.parse_args()
+
+    pandas_ms = total_ms(best_run(["-c", "import pandas"], "import pandas", args.repeat))
+    print(f"import pandas: {pandas_ms:.0f}ms")
+    results = [check(script, budget * args.scale, forbidden, args.top, pandas_ms, args.repeat)
+               for script, (budget, forbidden) in BUDGETS.items()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,62 @@
+"""Synthetic ServiceNow exports for the benchmarks.
+
+make_export() adds what the report stages read on top of make_tickets():
+INC/RITM ticket IDs, Created timestamps in the mixed formats real exports
+contain (including Excel serials) and Urgency. make_labeled() also adds a
+Service_Tag that mostly follows the assignment group, so a model trained
+on it behaves like the real one (a few dominant tags, some noise).
+"""
+import numpy as np
+import pandas as pd
+
+from bench_preprocess import make_tickets
+
+SERVICE_TAGS = ["SIP", "CF", "MVM", "HV", "IFS", "IW", "AUTO", "TEST"]
+URGENCIES = ["1 - High", "2 - Medium", "3 - Low"]
+
+# Most rows use the export's usual format; the rest mimic hand-edited or re-saved files
+CREATED_FORMATS = [
+    ("%m/%d/%Y %H:%M", 0.70),
+    ("%Y-%m-%d %H:%M:%S", 0.15),
+    ("%d-%m-%Y %H:%M", 0.05),
+    ("%m/%d/%Y", 0.05),
+    ("excel", 0.05),
+]
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+def _created(rng, rows, end, days):
+    """Created strings spread over `days` days before `end`, in mixed formats"""
+    offsets = rng.integers(0, days * 24 * 3600, rows)
+    stamps = pd.Timestamp(end) - pd.to_timedelta(offsets, unit="s")
+    formats = [fmt for fmt, _ in CREATED_FORMATS]
+    choice = rng.choice(len(formats), rows, p=[p for _, p in CREATED_FORMATS])
+    created = np.empty(rows, dtype=object)
+    for i, fmt in enumerate(formats):
+        mask = choice == i
+        if fmt == "excel":
+            serials = (stamps[mask] - EXCEL_EPOCH) / pd.Timedelta(days=1)
+            created[mask] = [f"{s:.6f}" for s in serials]
+        else:
+            created[mask] = stamps[mask].strftime(fmt)
+    return created
+
+def make_export(rows, seed=0, end="2025-06-30", days=400):
+    """An unlabeled export: ID, Created, Urgency and the five feature columns"""
+    rng = np.random.default_rng(seed)
+    df = make_tickets(rows, seed)
+    prefixes = rng.choice(["INC", "RITM", "SCTASK"], rows, p=[0.7, 0.28, 0.02])
+    df.insert(0, "ID", [f"{p}{n:07d}" for p, n in zip(prefixes, rng.permutation(rows) + 1000000)])
+    df.insert(1, "Created", _created(rng, rows, end, days))
+    df.insert(2, "Urgency", rng.choice(URGENCIES, rows, p=[0.1, 0.3, 0.6]))
+    return df
+
+def make_labeled(rows, seed=0, noise=0.1, **kwargs):
+    """make_export() plus a Service_Tag derived from the assignment group with some noise"""
+    rng = np.random.default_rng(seed + 1)
+    df = make_export(rows, seed, **kwargs)
+    group = df["Assignment group"].str.extract(r"Group (\d+)", expand=False).astype(int)
+    tags = np.array(SERVICE_TAGS, dtype=object)[group.to_numpy() % len(SERVICE_TAGS)]
+    flip = rng.random(rows) < noise
+    tags[flip] = rng.choice(SERVICE_TAGS, flip.sum())
+    df["Service_Tag"] = tags
+    return df
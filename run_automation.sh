@@ -12,10 +12,7 @@ end_date=${end_date//_/-}
 
 cmds="
 cd \"$project_root\" &&
-python3 src/classifier.py --predict \"data/raw/$(basename "$latest_file")\" --output \"data/processed/predictions.csv\" &&
-python3 src/utils/data_to_json.py --input data/processed/predictions.csv --start-date $start_date --end-date $end_date &&
-python3 src/utils/charts.py --input data/processed/service_summary.json --csv data/processed/predictions.csv --output data/charts &&
-python3 src/utils/visualization.py --input data/processed/service_summary.json --output data/reports/
+python3 src/pipeline.py --input \"data/raw/$(basename "$latest_file")\" --start-date $start_date --end-date $end_date
 "
 
 echo -e "📦 Commands to run:\n$cmds"
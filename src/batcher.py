@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from utils.timing import LatencyWindow
+
+class MicroBatcher:
+    """Collect single-ticket predictions into batches for one vectorized call.
+
+    Tickets queued with predict() are gathered until max_batch_size of them
+    are waiting or max_wait_ms passed since the first one, then the batch
+    goes through classifier.predict_frame (TF-IDF, forest and business
+    rules once) in a worker thread and every caller's future is resolved
+    with its own tag. While a batch is being predicted the next one fills
+    up, so throughput grows with load without holding a lone ticket back
+    for more than max_wait_ms.
+    """
+
+    def __init__(self, classifier, max_batch_size=64, max_wait_ms=5.0):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.tickets = 0
+        self.latencies = LatencyWindow()
+        self.started = None
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        if self.classifier.load_model() is None:
+            raise RuntimeError("Could not load the model - train it first")
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        self.started = time.perf_counter()
+        return self
+
+    async def stop(self):
+        """Finish the queued tickets, then stop the batching task"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def predict(self, row):
+        """Predicted service tag (after business rules) for one ticket given as a dict"""
+        missing_cols = [col for col in self.classifier.features if col not in row]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def predict_many(self, rows):
+        """Tags for several tickets; they are batched together with everyone else's"""
+        return await asyncio.gather(*(self.predict(row) for row in rows))
+
+    async def _next_batch(self):
+        """Wait for one ticket, then take more until the batch is full or max_wait_ms is up"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _predict_batch(self, rows):
+        df = pd.DataFrame(rows, dtype=object)
+        result = self.classifier.predict_frame(df)
+        if result is None:
+            raise RuntimeError("Prediction failed")
+        return result['Predicted_Service_Tag'].tolist()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                # The forest runs in a worker thread so new tickets keep queueing meanwhile
+                tags = await loop.run_in_executor(None, self._predict_batch, [row for row, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                done = time.perf_counter()
+                for (_, future, queued), tag in zip(batch, tags):
+                    if not future.done():
+                        future.set_result(tag)
+                    self.latencies.add((done - queued) * 1000)
+                self.batches += 1
+                self.tickets += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def metrics(self):
+        """Batch counts, tickets per second since start() and per-ticket latency percentiles"""
+        metrics = {
+            "batches": self.batches,
+            "tickets": self.tickets,
+            "mean_batch_size": round(self.tickets / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+        if self.started is not None:
+            elapsed = time.perf_counter() - self.started
+            metrics["tickets_per_second"] = round(self.tickets / elapsed, 1) if elapsed else 0.0
+        latency_ms = self.latencies.percentiles()
+        if latency_ms is not None:
+            metrics["latency_ms"] = latency_ms
+        return metrics
@@ -0,0 +1,104 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from utils.timing import span
+
+FEATURE_COLUMNS = [
+    'Short description',
+    'Assignment group',
+    'Configuration item',
+    'Business Unit',
+    'Item'
+]
+
+# A rule fires when any of its column patterns matches (case-insensitive search).
+# `when_tag` restricts it to rows currently predicted as that tag, and `negate`
+# fires it when none of the patterns match instead.
+Rule = namedtuple('Rule', ['name', 'tag', 'patterns', 'when_tag', 'negate'], defaults=(None, False))
+
+def _all_columns(pattern):
+    return {col: pattern for col in FEATURE_COLUMNS}
+
+# Rules run in this order, so a later rule overrides an earlier one
+BUSINESS_RULES = [
+    # Jumphost resets and SIP_ configuration items
+    Rule('SIP', 'SIP', {
+        'Short description': r'jumphost.*reset|reset.*jumphost|jump host|jumpbox|jump box',
+        'Configuration item': r'^SIP_',
+    }),
+    # TEST predictions without 'test' in the description are cleared
+    Rule('TEST', 'missing', {'Short description': 'test'}, when_tag='TEST', negate=True),
+    Rule('IW', 'IW', {'Configuration item': r'^indwireless_'}),
+    Rule('IFS', 'IFS', _all_columns(r'\bifs\b')),
+    Rule('CF', 'CF', _all_columns('confluence')),
+    Rule('MVM', 'MVM', _all_columns('mavim')),
+    Rule('AUTO', 'AUTO', {'Assignment group': 'automation'}),
+    # MVM on the CI wins over AUTO
+    Rule('MVM (from CI)', 'MVM', {'Configuration item': 'mavim'}),
+]
+
+class RuleEngine:
+    """Evaluate a rule table with one combined regex per column.
+
+    Every rule pattern on a column becomes an optional lookahead with its
+    own named group, so a single match per distinct value tells which
+    rules hit it. Values are factorized first, so low-cardinality columns
+    like Assignment group are only scanned once per distinct value.
+    """
+
+    def __init__(self, rules=BUSINESS_RULES):
+        self.rules = list(rules)
+        self.column_patterns = {}
+        for i, rule in enumerate(self.rules):
+            for col, pattern in rule.patterns.items():
+                group = f"r{i}"
+                lookahead = rf"(?:(?=[\s\S]*?(?P<{group}>{pattern})))?"
+                self.column_patterns.setdefault(col, []).append((i, lookahead))
+        self.compiled = {
+            col: re.compile("".join(part for _, part in parts), re.IGNORECASE)
+            for col, parts in self.column_patterns.items()
+        }
+        self.hits = {}
+
+    def _column_matches(self, values, col):
+        """Boolean matrix (rows x rules on this column) of pattern hits"""
+        rule_ids = [i for i, _ in self.column_patterns[col]]
+        codes, uniques = pd.factorize(values)
+        compiled = self.compiled[col]
+        unique_hits = np.zeros((len(uniques) + 1, len(rule_ids)), dtype=bool)
+        for u, value in enumerate(uniques):
+            match = compiled.match(str(value))
+            unique_hits[u] = [match.group(f"r{i}") is not None for i in rule_ids]
+        # Missing values (code -1) pick the all-False last row
+        return rule_ids, unique_hits[codes]
+
+    def match(self, df):
+        """Boolean mask per rule, in rule order"""
+        masks = [np.zeros(len(df), dtype=bool) for _ in self.rules]
+        for col in self.compiled:
+            rule_ids, hits = self._column_matches(df[col], col)
+            for k, i in enumerate(rule_ids):
+                masks[i] |= hits[:, k]
+        return masks
+
+    def apply(self, df, tag_column='Predicted_Service_Tag', verbose=True):
+        """Rewrite the tag column in place and return per-rule hit counts"""
+        tags = df[tag_column].to_numpy(dtype=object).copy()
+        self.hits = {}
+        # All rules are matched together (one regex per column), so they share one span
+        with span("business_rules.match", rows=len(df)):
+            masks = self.match(df)
+        for rule, mask in zip(self.rules, masks):
+            if rule.negate:
+                mask = ~mask
+            if rule.when_tag is not None:
+                mask = mask & (tags == rule.when_tag)
+            tags[mask] = rule.tag
+            self.hits[rule.name] = int(mask.sum())
+            if verbose:
+                print(f"[RULE] {rule.name} reassignment applied to {self.hits[rule.name]} tickets")
+        df[tag_column] = tags
+        return self.hits
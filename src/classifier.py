@@ -3,18 +3,56 @@ import numpy as np
 import re
 import joblib
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
 import argparse
+import warnings
+from joblib import Parallel, delayed, effective_n_jobs, parallel_config
+
+from business_rules import RuleEngine
+from feature_store import FeatureStore, feature_coverage, preprocessor_signature
+from inference import LightweightPredictor, artifact_matches, export_artifact, predict_top_k
+from prediction_cache import PredictionCache, row_keys
+from utils.data_to_json import count_tickets, combine_counts, write_counts
+from utils.loaders import PredictionWriter, load_csv, prediction_path, write_predictions
+from utils.timing import span
+
+SPECIAL_CHARS = re.compile(r'[^\w\s-]')
+
+# Categories seen fewer than MIN_CATEGORY_FREQUENCY times in training (or beyond
+# the MAX_CATEGORIES most frequent per column) share one "infrequent" column
+MIN_CATEGORY_FREQUENCY = 5
+MAX_CATEGORIES = 1000
+
+# Batches smaller than this are predicted in-process even when n_jobs is set
+PARALLEL_PREDICT_MIN_ROWS = 20000
+
+# The NumPy artifact loads fast but walks the trees several times slower than
+# sklearn, so it only predicts batches up to this many rows (server requests)
+ARTIFACT_MAX_ROWS = 64
+
+def _predict_rows(model, X, top_k=None):
+    """Prediction worker returning (tags,) or (top-k tags, probabilities); module level so joblib can pickle it"""
+    if top_k:
+        return predict_top_k(model, X, top_k)
+    return (model.predict(X),)
+
+# Incremental retraining falls back to a full refit when new tickets lose more
+# than DRIFT_THRESHOLD of vocabulary/category coverage or the forest would
+# grow past MAX_TREES
+DRIFT_THRESHOLD = 0.1
+MAX_TREES = 400
 
 class ServiceTagClassifier:
-    def __init__(self):
+    def __init__(self, use_artifact=False, n_jobs=None, backend=None, encoding=None, prediction_cache=False,
+                 top_k=None, verbose=True):
+        """n_jobs/backend follow joblib: n_jobs=-1 uses every core, backend is
+        'loky', 'threading' or 'multiprocessing' (None keeps sklearn's choice).
+        prediction_cache keeps tags of seen feature rows in models/prediction_cache.joblib.
+        top_k adds Top_<i>_Tag/Top_<i>_Probability columns for the k most likely tags.
+        use_artifact loads the NumPy artifact instead of unpickling sklearn (cold
+        start); batches over ARTIFACT_MAX_ROWS still load and use the pipeline.
+        verbose=False silences the per-batch progress lines (the server sets it)"""
         self.model = None
+        self._pipeline = None
         self.features = [
             'Short description',
             'Assignment group',
@@ -24,57 +62,67 @@ class ServiceTagClassifier:
         ]
         self.target = 'Service_Tag'
         self.model_path = Path('models/service_tag_model.pkl')
+        self.artifact_dir = Path('models/service_tag_model_light')
+        self.feature_store = FeatureStore('models/feature_store.joblib')
+        self.use_artifact = use_artifact
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.encoding = encoding
+        self.rule_engine = RuleEngine()
+        self.rule_hits = {}
+        self.prediction_cache = PredictionCache('models/prediction_cache.joblib') if prediction_cache else None
+        self.top_k = top_k
+        self.verbose = verbose
+
+    def _log(self, message):
+        """Progress output; errors are always printed"""
+        if self.verbose:
+            print(message)
         
     def _clean_text(self, text):
         """Clean and standardize text data"""
         if pd.isna(text):
             return ""
         text = str(text).lower().strip()
-        text = re.sub(r'[^\w\s-]', '', text)  # Remove special chars
+        text = SPECIAL_CHARS.sub('', text)  # Remove special chars
         return text
 
     def _load_csv_with_fallback(self, filepath):
-        """Load CSV with robust encoding handling"""
-        import chardet
-        # Try common encodings first
-        encodings_to_try = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-        
-        for encoding in encodings_to_try:
-            try:
-                df = pd.read_csv(filepath, dtype=str, encoding=encoding, low_memory=False)
-                print(f"Successfully read with {encoding} encoding")
-                return df
-            except UnicodeDecodeError:
-                continue
-        
-        # If none of the common encodings worked, try chardet
-        try:
-            with open(filepath, 'rb') as f:
-                rawdata = f.read(100000)  # Read more bytes for better detection
-                result = chardet.detect(rawdata)
-                encoding = result['encoding'] or 'latin1'
-                print(f"Detected encoding: {encoding} (confidence: {result['confidence']})")
-                return pd.read_csv(filepath, dtype=str, encoding=encoding, low_memory=False)
-        except Exception as e:
-            print(f"Failed to detect encoding: {e}")
-            raise
-        
+        """Load CSV with the detected (or --encoding) encoding, reading the file once"""
+        with span("load_csv") as stage:
+            df = load_csv(filepath, encoding=self.encoding, dtype=str, low_memory=False)
+            stage.rows = len(df)
+        return df
+
+    def _clean_column(self, values):
+        """Apply _clean_text once per distinct value and map the results back.
+
+        Columns like Assignment group and Configuration item only have a few
+        hundred distinct values, so this avoids cleaning the same string
+        thousands of times. Missing values get code -1, which picks the
+        cleaned NaN appended at the end.
+        """
+        codes, uniques = pd.factorize(values)
+        cleaned = [self._clean_text(value) for value in uniques]
+        cleaned.append(self._clean_text(np.nan))
+        return pd.Series(np.array(cleaned, dtype=object)[codes], index=values.index, name=values.name)
+
     def preprocess_data(self, df):
         """Preprocess the input dataframe"""
-        # Clean text features
-        for col in self.features:
-            if col in df.columns:
-                df[col] = df[col].apply(self._clean_text)
-        
-        # Handle missing values
-        for col in self.features:
-            if col in df.columns:
-                df[col] = df[col].fillna('missing')
+        # Clean text features (missing values become "")
+        with span("preprocess_data", rows=len(df)):
+            for col in self.features:
+                if col in df.columns:
+                    df[col] = self._clean_column(df[col])
         
         return df
     
     def train(self, data_path, test_size=0.2, save_model=True):
         """Train the classifier model"""
+        # Imported here so loading the classifier module stays cheap (server cold start)
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import classification_report
+
         try:
             df = self._load_csv_with_fallback(data_path)
         except Exception as e:
@@ -99,7 +147,142 @@ class ServiceTagClassifier:
             X, y, test_size=test_size, random_state=42
         )
         
-        # Define preprocessing pipeline
+        self.model = self.build_pipeline()
+        
+        # Train model
+        print("Training model...")
+        try:
+            with self._parallel_config():
+                self.model.fit(X_train, y_train)
+        except Exception as e:
+            print(f"Error during training: {e}")
+            return None
+        
+        # Evaluate
+        print("\nModel evaluation:")
+        y_pred = self.model.predict(X_test)
+        print(classification_report(y_test, y_pred))
+        
+        # Save model
+        if save_model:
+            self._save_model()
+            if 'ID' in df.columns:
+                # Vectorized rows for later incremental retrains
+                df = df.drop_duplicates('ID', keep='last')
+                preprocessor = self.model.named_steps['preprocessor']
+                self.feature_store.rebuild(preprocessor, df['ID'], df[self.features], df[self.target])
+                self.feature_store.save()
+        
+        return self.model
+
+    def train_incremental(self, data_path, new_trees=50):
+        """Retrain on newly labeled tickets without redoing the historical ones.
+
+        Tickets whose ID is already in the feature store with the same label
+        are skipped; the rest are vectorized with the existing preprocessor,
+        added to the store and new_trees trees are grown on the combined
+        matrix with warm_start. Falls back to a full train() when there is no
+        store yet, the vocabulary drifted, new classes appeared or the
+        forest would grow past MAX_TREES.
+        """
+        if not self.model_path.exists() or not self.feature_store.exists():
+            print("No saved model or feature store - running a full training")
+            return self.train(data_path)
+
+        try:
+            df = self._load_csv_with_fallback(data_path)
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return None
+        
+        df = self.preprocess_data(df)
+        
+        missing_cols = [col for col in [self.target, 'ID'] if col not in df.columns]
+        if missing_cols:
+            print(f"Error: Missing required columns: {missing_cols}")
+            return None
+        
+        df = df[df[self.target] != 'IPR'].drop_duplicates('ID', keep='last')
+        
+        model = joblib.load(self.model_path)
+        preprocessor = model.named_steps['preprocessor']
+        forest = model.named_steps['classifier']
+        store = self.feature_store.load()
+        
+        fresh = df[store.is_new(df['ID'], df[self.target])]
+        print(f"[INCREMENTAL] {len(fresh)} new or relabeled tickets out of {len(df)}")
+        if fresh.empty:
+            self.model = model
+            return self.model
+        
+        X_new = fresh[self.features]
+        y_new = fresh[self.target]
+        drift = store.drift(feature_coverage(preprocessor, X_new))
+        new_classes = sorted(set(y_new) - set(forest.classes_))
+        if store.signature != preprocessor_signature(preprocessor):
+            reason = "feature store was built for a different model"
+        elif drift > DRIFT_THRESHOLD:
+            reason = f"vocabulary drift {drift:.2f} above {DRIFT_THRESHOLD}"
+        elif new_classes:
+            reason = f"new service tags {new_classes}"
+        elif forest.n_estimators + new_trees > MAX_TREES:
+            reason = f"forest would exceed {MAX_TREES} trees"
+        else:
+            reason = None
+        if reason:
+            print(f"[INCREMENTAL] {reason} - running a full training")
+            return self.train(data_path)
+        
+        accuracy = (model.predict(X_new) == y_new.to_numpy()).mean()
+        print(f"[INCREMENTAL] Current model accuracy on the new tickets: {accuracy:.3f} (drift {drift:.2f})")
+        
+        store.update(fresh['ID'], preprocessor.transform(X_new), y_new)
+        forest.set_params(warm_start=True, n_estimators=forest.n_estimators + new_trees,
+                          n_jobs=self.n_jobs, verbose=0)
+        print(f"Adding {new_trees} trees on {len(store.ids)} tickets...")
+        try:
+            with self._parallel_config(), warnings.catch_warnings():
+                # 'balanced' is computed on the whole store, which is what sklearn asks for
+                warnings.filterwarnings('ignore', message='class_weight presets')
+                forest.fit(store.X, store.y)
+        except Exception as e:
+            print(f"Error during training: {e}")
+            return None
+        forest.set_params(warm_start=False)
+        
+        self.model = model
+        self._save_model()
+        store.save()
+        return self.model
+
+    def _save_model(self):
+        try:
+            self.model_path.parent.mkdir(exist_ok=True)
+            joblib.dump(self.model, self.model_path)
+            print(f"\nModel saved to {self.model_path}")
+        except Exception as e:
+            print(f"Error saving model: {e}")
+        self.export_artifact()
+
+    def _parallel_config(self):
+        """joblib context for fitting; backend=None keeps joblib's default"""
+        if self.backend is None:
+            return parallel_config(n_jobs=self.n_jobs)
+        return parallel_config(backend=self.backend, n_jobs=self.n_jobs)
+
+    def build_pipeline(self):
+        """Untrained TF-IDF + one-hot + random forest pipeline.
+
+        The feature matrix stays sparse end to end: the one-hot block is
+        emitted as CSR, rare categories are pooled into one column per
+        feature, and the ColumnTransformer never densifies the stack.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import OneHotEncoder
+        from sklearn.compose import ColumnTransformer
+        from sklearn.pipeline import Pipeline
+        from sklearn.ensemble import RandomForestClassifier
+
         preprocessor = ColumnTransformer(
             transformers=[
                 ('desc', TfidfVectorizer(
@@ -109,68 +292,71 @@ class ServiceTagClassifier:
                  'Short description'),
                 ('cat', OneHotEncoder(
                     handle_unknown='ignore',
-                    sparse_output=False),
+                    min_frequency=MIN_CATEGORY_FREQUENCY,
+                    max_categories=MAX_CATEGORIES,
+                    sparse_output=True),
                  ['Assignment group', 'Configuration item', 'Business Unit', 'Item'])
             ],
-            remainder='drop'
+            remainder='drop',
+            sparse_threshold=1.0
         )
         
-        # Create model pipeline
-        self.model = Pipeline([
+        return Pipeline([
             ('preprocessor', preprocessor),
             ('classifier', RandomForestClassifier(
                 n_estimators=200,
                 class_weight='balanced',
                 random_state=42,
-                verbose=1
+                n_jobs=self.n_jobs,
+                verbose=0
             ))
         ])
-        
-        # Train model
-        print("Training model...")
+
+    def export_artifact(self):
+        """Export the trained pipeline as the NumPy inference artifact used for small batches"""
+        if self.model is None:
+            self.model = joblib.load(self.model_path)
         try:
-            self.model.fit(X_train, y_train)
+            export_artifact(self.model, self.artifact_dir, source_path=self.model_path)
         except Exception as e:
-            print(f"Error during training: {e}")
-            return None
-        
-        # Evaluate
-        print("\nModel evaluation:")
-        y_pred = self.model.predict(X_test)
-        print(classification_report(y_test, y_pred))
-        
-        # Save model
-        if save_model:
-            try:
-                self.model_path.parent.mkdir(exist_ok=True)
-                joblib.dump(self.model, self.model_path)
-                print(f"\nModel saved to {self.model_path}")
-            except Exception as e:
-                print(f"Error saving model: {e}")
-        
-        return self.model
+            print(f"Error exporting inference artifact: {e}")
     
-    def predict(self, new_data_path, output_path=None):
-        """Predict service tags for new tickets"""
-        # Load model if not already loaded
+    def load_model(self):
+        """Load the trained model from disk if not already loaded"""
         if self.model is None:
             if not self.model_path.exists():
                 raise FileNotFoundError(
                     f"Model not found at {self.model_path}. Please train first."
                 )
             try:
-                self.model = joblib.load(self.model_path)
+                if self.use_artifact and artifact_matches(self.artifact_dir, self.model_path):
+                    # Memory-mapped arrays, no sklearn unpickling
+                    self.model = LightweightPredictor(self.artifact_dir)
+                else:
+                    self.model = self._load_pipeline()
+                if self.prediction_cache is not None:
+                    self.prediction_cache.load(self.model_path)
             except Exception as e:
                 print(f"Error loading model: {e}")
-                return None
-        
-        # Load and preprocess new data
-        try:
-            new_data = self._load_csv_with_fallback(new_data_path)
-        except Exception as e:
-            print(f"Error loading new data: {e}")
+        return self.model
+
+    def _load_pipeline(self):
+        if self._pipeline is None:
+            self._pipeline = joblib.load(self.model_path)
+            self._pipeline.set_params(classifier__n_jobs=self.n_jobs, classifier__verbose=0)
+        return self._pipeline
+
+    def _model_for(self, n_rows):
+        """The loaded model, or the sklearn pipeline for artifact batches over ARTIFACT_MAX_ROWS"""
+        if isinstance(self.model, LightweightPredictor) and n_rows > ARTIFACT_MAX_ROWS:
+            return self._load_pipeline()
+        return self.model
+
+    def predict_frame(self, new_data):
+        """Predict service tags for an already loaded dataframe"""
+        if self.load_model() is None:
             return None
-        
+
         new_data = self.preprocess_data(new_data)
         
         # Verify all required columns exist
@@ -180,10 +366,19 @@ class ServiceTagClassifier:
             return None
         
         # Predict service tags
-        print("\nPredicting service tags...")
+        self._log("\nPredicting service tags...")
         try:
             X_new = new_data[self.features]
-            new_data['Predicted_Service_Tag'] = self.model.predict(X_new)
+            outputs = self._predict_unique(X_new)
+            if self.top_k:
+                # Top_1_Tag is the model's tag; Predicted_Service_Tag may still be changed by the rules
+                labels, probs = outputs
+                new_data['Predicted_Service_Tag'] = labels[:, 0]
+                for i in range(labels.shape[1]):
+                    new_data[f'Top_{i + 1}_Tag'] = labels[:, i]
+                    new_data[f'Top_{i + 1}_Probability'] = probs[:, i]
+            else:
+                new_data['Predicted_Service_Tag'] = outputs[0]
         except Exception as e:
             print(f"Error during prediction: {e}")
             return None
@@ -191,91 +386,179 @@ class ServiceTagClassifier:
         # Apply business rules
         self._apply_business_rules(new_data)
         
+        return new_data
+
+    def _predict_unique(self, X):
+        """Predict every distinct cleaned feature row once and map the tags back.
+
+        Automated alerts and standard catalog requests share the same five
+        features, so often most rows are duplicates. With the prediction
+        cache, distinct rows predicted in earlier runs are not predicted again.
+        Returns the _predict_model outputs expanded to every row of X.
+        """
+        codes = X.groupby(self.features, sort=False, dropna=False).ngroup().to_numpy()
+        # ngroup numbers groups in order of first appearance, so first[k] is the first row of group k
+        first = np.unique(codes, return_index=True)[1]
+        unique_X = X.iloc[first]
+        if len(unique_X) < len(X):
+            self._log(f"[DEDUP] {len(X)} rows, {len(unique_X)} distinct feature rows")
+
+        if self.prediction_cache is None:
+            outputs = self._predict_model(unique_X)
+        else:
+            outputs = self._predict_cached(unique_X)
+        return tuple(output[codes] for output in outputs)
+
+    def _predict_cached(self, X):
+        """_predict_model, only run for the rows missing from the prediction cache.
+
+        Cached values are the tag, or (tags, probabilities) lists under keys
+        salted with k in top-k mode.
+        """
+        keys = row_keys(X, salt=f"top{self.top_k}" if self.top_k else "")
+        values = self.prediction_cache.get_many(keys)
+        missing = [i for i, value in enumerate(values) if value is None]
+        if missing:
+            fresh = self._predict_model(X.iloc[missing])
+            fresh = list(zip(*(output.tolist() for output in fresh))) if self.top_k else fresh[0].tolist()
+            for i, value in zip(missing, fresh):
+                values[i] = value
+            self.prediction_cache.put_many([keys[i] for i in missing], fresh)
+        self._log(f"[CACHE] {len(keys) - len(missing)} of {len(keys)} distinct rows served from the prediction cache")
+
+        if not self.top_k:
+            return (np.array(values, dtype=object),)
+        k = min(self.top_k, len(self.model.classes_))
+        labels = np.array([value[0] for value in values], dtype=object).reshape(len(values), k)
+        probs = np.array([value[1] for value in values], dtype=np.float32).reshape(len(values), k)
+        return labels, probs
+
+    def _save_prediction_cache(self):
+        if self.prediction_cache is not None:
+            self.prediction_cache.save()
+
+    def _predict_model(self, X):
+        """(tags,) or, with top_k, (top-k tags, probabilities) from one pass over the forest.
+
+        Large batches are split over a process pool when n_jobs allows, with
+        the forest predicting on a single thread in each worker.
+        """
+        n_jobs = effective_n_jobs(self.n_jobs)
+        model = self._model_for(len(X))
+        if n_jobs <= 1 or len(X) < PARALLEL_PREDICT_MIN_ROWS:
+            with span("model.predict", rows=len(X)):
+                return _predict_rows(model, X, self.top_k)
+
+        parts = np.array_split(np.arange(len(X)), n_jobs)
+        self._log(f"Predicting {len(X)} rows in {n_jobs} parallel batches...")
+        # The batches are the parallelism: a forest on n_jobs threads in every worker would run n_jobs² threads
+        forest_jobs = model.get_params()["classifier__n_jobs"] if hasattr(model, "get_params") else None
+        if forest_jobs is not None:
+            model.set_params(classifier__n_jobs=1)
+        try:
+            with span("model.predict", rows=len(X)), parallel_config(backend=self.backend or 'loky'):
+                results = Parallel(n_jobs=n_jobs)(
+                    delayed(_predict_rows)(model, X.iloc[rows], self.top_k) for rows in parts
+                )
+        finally:
+            if forest_jobs is not None:
+                model.set_params(classifier__n_jobs=forest_jobs)
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    @staticmethod
+    def output_paths(output_path, export_csv=False):
+        """output_path plus a CSV copy next to it when a Parquet output should also be exported"""
+        paths = [Path(output_path)]
+        if export_csv and paths[0].suffix != '.csv':
+            paths.append(prediction_path(output_path, 'csv'))
+        return paths
+
+    def predict(self, new_data_path, output_path=None, export_csv=False):
+        """Predict service tags for new tickets (CSV or Parquet output, by suffix)"""
+        # Load model if not already loaded
+        if self.load_model() is None:
+            return None
+
+        # Load new data
+        try:
+            new_data = self._load_csv_with_fallback(new_data_path)
+        except Exception as e:
+            print(f"Error loading new data: {e}")
+            return None
+        
+        new_data = self.predict_frame(new_data)
+        if new_data is None:
+            return None
+        self._save_prediction_cache()
+        
         # Save results
         if output_path:
             try:
-                Path(output_path).parent.mkdir(exist_ok=True)
-                new_data.to_csv(output_path, index=False, encoding='utf-8')
-                print(f"Predictions saved to {output_path}")
+                for path in self.output_paths(output_path, export_csv):
+                    write_predictions(new_data, path)
+                    print(f"Predictions saved to {path}")
             except Exception as e:
                 print(f"Error saving predictions: {e}")
         
         return new_data
+
+    def predict_chunked(self, new_data_path, output_path, chunksize=50000, export_csv=False):
+        """Stream a large export through prediction chunk by chunk.
+
+        Each chunk is preprocessed, predicted, run through the business rules
+        and appended to output_path, so peak memory depends on chunksize and
+        not on the export size. Daily ticket counters are accumulated on the
+        way and returned (and saved next to the output) for the summary step.
+        """
+        if self.load_model() is None:
+            return None
+
+        output_path = Path(output_path)
+        writers = [PredictionWriter(path) for path in self.output_paths(output_path, export_csv)]
+
+        counts = None
+        rule_hits = {}
+        rows = 0
+        try:
+            reader = load_csv(new_data_path, encoding=self.encoding, chunksize=chunksize, dtype=str)
+            for i, chunk in enumerate(reader):
+                chunk = self.predict_frame(chunk)
+                if chunk is None:
+                    return None
+                for writer in writers:
+                    writer.write(chunk)
+
+                chunk_counts = count_tickets(chunk, offset=rows)
+                counts = chunk_counts if counts is None else combine_counts([counts, chunk_counts])
+                for name, hits in self.rule_hits.items():
+                    rule_hits[name] = rule_hits.get(name, 0) + hits
+                rows += len(chunk)
+                print(f"[CHUNK] {i + 1}: {rows} rows predicted")
+        except Exception as e:
+            print(f"Error during chunked prediction: {e}")
+            return None
+        finally:
+            for writer in writers:
+                writer.close()
+
+        self.rule_hits = rule_hits
+        self._save_prediction_cache()
+        print(f"Predictions saved to {output_path}")
+        if counts is not None:
+            write_counts(counts, self.counts_path(output_path))
+        return counts
+
+    @staticmethod
+    def counts_path(output_path):
+        """Where predict_chunked saves the ticket counters for output_path"""
+        output_path = Path(output_path)
+        return output_path.with_name(f"{output_path.stem}_counts.csv")
     
  
     def _apply_business_rules(self, df):
         """Apply specific business rules to predictions"""
         try:
-            # === SIP Rule ===
-            # Match if 'jumphost' and 'reset' or related terms in description
-            mask_sip_desc = df['Short description'].str.contains(
-                r'jumphost.*reset|reset.*jumphost|jump host|jumpbox|jump box',
-                case=False, na=False
-            )
-            
-            # Match if Configuration item starts with SIP_
-            mask_sip_ci = df['Configuration item'].str.match(r'^SIP_', case=False, na=False)
-
-            # Combine both SIP conditions
-            mask_sip_combined = mask_sip_desc | mask_sip_ci
-            df.loc[mask_sip_combined, 'Predicted_Service_Tag'] = 'SIP'
-            print(f"[RULE] SIP reassignment applied to {mask_sip_combined.sum()} tickets")
-
-            # === TEST Rule ===
-            mask_test = df['Predicted_Service_Tag'] == 'TEST'
-            test_desc_mask = df['Short description'].str.contains('test', case=False, na=False)
-            cleaned = mask_test & ~test_desc_mask
-            df.loc[cleaned, 'Predicted_Service_Tag'] = df.loc[cleaned, 'Predicted_Service_Tag'].apply(
-                lambda x: x if x != 'TEST' else 'missing'
-            )
-            print(f"[RULE] TEST cleared from {cleaned.sum()} tickets (no 'test' in desc)")
-            # === Industrial Wireless (IW) Rule ===
-            mask_iw = df['Configuration item'].str.match(r'^indwireless_', case=False, na=False)
-            df.loc[mask_iw, 'Predicted_Service_Tag'] = 'IW'
-            print(f"[RULE] IW reassignment applied to {mask_iw.sum()} tickets")
-            # === IFS Rule ===
-            mask_ifs = (
-                df['Short description'].str.contains(r'\bifs\b', case=False, na=False) |
-                df['Assignment group'].str.contains(r'\bifs\b', case=False, na=False) |
-                df['Configuration item'].str.contains(r'\bifs\b', case=False, na=False) |
-                df['Business Unit'].str.contains(r'\bifs\b', case=False, na=False) |
-                df['Item'].str.contains(r'\bifs\b', case=False, na=False)
-            )
-            df.loc[mask_ifs, 'Predicted_Service_Tag'] = 'IFS'
-            print(f"[RULE] IFS reassignment applied to {mask_ifs.sum()} tickets")
-
-            # === Confluence Rule (CF) ===
-            mask_cf = (
-                df['Short description'].str.contains('confluence', case=False, na=False) |
-                df['Assignment group'].str.contains('confluence', case=False, na=False) |
-                df['Configuration item'].str.contains('confluence', case=False, na=False) |
-                df['Business Unit'].str.contains('confluence', case=False, na=False) |
-                df['Item'].str.contains('confluence', case=False, na=False)
-            )
-            df.loc[mask_cf, 'Predicted_Service_Tag'] = 'CF'
-            print(f"[RULE] CF reassignment applied to {mask_cf.sum()} tickets")
-
-            # === MAVIM Rule (MVM) ===
-            mask_mvm = (
-                df['Short description'].str.contains('mavim', case=False, na=False) |
-                df['Assignment group'].str.contains('mavim', case=False, na=False) |
-                df['Configuration item'].str.contains('mavim', case=False, na=False) |
-                df['Business Unit'].str.contains('mavim', case=False, na=False) |
-                df['Item'].str.contains('mavim', case=False, na=False)
-            )
-            df.loc[mask_mvm, 'Predicted_Service_Tag'] = 'MVM'
-            print(f"[RULE] MVM reassignment applied to {mask_mvm.sum()} tickets")
-
-            # === AUTO Rule ===
-            mask_auto = df['Assignment group'].str.contains('automation', case=False, na=False)
-            df.loc[mask_auto, 'Predicted_Service_Tag'] = 'AUTO'
-            print(f"[RULE] AUTO reassignment applied to {mask_auto.sum()} tickets")
-
-            # Optional redundancy for MVM (CI match)
-            mask_mvm_ci = df['Configuration item'].str.contains('mavim', case=False, na=False)
-            df.loc[mask_mvm_ci, 'Predicted_Service_Tag'] = 'MVM'
-            print(f"[RULE] MVM (from CI) reassignment applied to {mask_mvm_ci.sum()} tickets")
-
+            self.rule_hits = self.rule_engine.apply(df, verbose=self.verbose)
         except Exception as e:
             print(f"Error applying business rules: {e}")
         
@@ -285,15 +568,37 @@ class ServiceTagClassifier:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Service Ticket Tag Classifier')
     parser.add_argument('--train', help='Path to labeled training data')
+    parser.add_argument('--incremental', action='store_true', help='With --train, only add trees for new or relabeled tickets')
+    parser.add_argument('--new-trees', type=int, default=50, help='Trees added by an incremental retrain')
     parser.add_argument('--predict', help='Path to new unlabeled data')
     parser.add_argument('--output', help='Output path for predictions')
+    parser.add_argument('--format', choices=['csv', 'parquet'], help='Predictions format (default: from the --output suffix)')
+    parser.add_argument('--export-csv', action='store_true', help='With --format parquet, also write a CSV copy')
     parser.add_argument('--encoding', help='Force specific encoding (optional)')
+    parser.add_argument('--chunksize', type=int, help='Stream --predict in chunks of this many rows (bounded memory)')
+    parser.add_argument('--export-artifact', action='store_true', help='Export the saved model as the lightweight inference artifact')
+    parser.add_argument('--artifact', action='store_true', help=f'Load the NumPy artifact (fast cold start) for batches up to {ARTIFACT_MAX_ROWS} distinct rows')
+    parser.add_argument('--prediction-cache', action='store_true', help='Reuse tags of feature rows predicted in earlier runs')
+    parser.add_argument('--top-k', type=int, help='Also write the K most likely tags with their probabilities')
+    parser.add_argument('--n-jobs', type=int, help='Cores for training and large predictions (-1 = all cores)')
+    parser.add_argument('--backend', choices=['loky', 'threading', 'multiprocessing'], help='joblib backend used with --n-jobs')
     args = parser.parse_args()
     
-    classifier = ServiceTagClassifier()
+    classifier = ServiceTagClassifier(use_artifact=args.artifact, n_jobs=args.n_jobs, backend=args.backend,
+                                      encoding=args.encoding, prediction_cache=args.prediction_cache, top_k=args.top_k)
     
-    if args.train:
+    if args.train and args.incremental:
+        classifier.train_incremental(args.train, args.new_trees)
+    elif args.train:
         classifier.train(args.train)
+    elif args.export_artifact:
+        classifier.export_artifact()
     if args.predict:
-        classifier.predict(args.predict, args.output)
+        output = prediction_path(args.output, args.format) if args.output and args.format else args.output
+        if args.chunksize:
+            if not output:
+                parser.error('--chunksize needs --output to stream predictions to')
+            classifier.predict_chunked(args.predict, output, args.chunksize, args.export_csv)
+        else:
+            classifier.predict(args.predict, output, args.export_csv)
     
\ No newline at end of file
@@ -0,0 +1,106 @@
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+def preprocessor_signature(preprocessor):
+    """Hash of what a fitted ColumnTransformer learned; stored rows are only valid for the same one"""
+    # Hash the fitted state itself: pickling the transformer is not stable across save/load
+    tfidf = preprocessor.named_transformers_['desc']
+    encoder = preprocessor.named_transformers_['cat']
+    return joblib.hash([
+        sorted(tfidf.vocabulary_.items()),
+        tfidf.idf_.tolist(),
+        [[str(c) for c in categories] for categories in encoder.categories_],
+        list(preprocessor.get_feature_names_out()),
+    ])
+
+def feature_coverage(preprocessor, X):
+    """How much of X the fitted preprocessor knows about, per input block.
+
+    'Short description' is the share of analyzer tokens that are in the
+    TF-IDF vocabulary; each categorical column is the share of values
+    that were seen during fit. Both drop when the ticket vocabulary drifts.
+    """
+    coverage = {}
+    tfidf = preprocessor.named_transformers_['desc']
+    analyzer = tfidf.build_analyzer()
+    vocabulary = tfidf.vocabulary_
+    codes, docs = pd.factorize(X['Short description'])
+    counts = np.bincount(codes[codes >= 0], minlength=len(docs))
+    known = total = 0
+    for doc, n in zip(docs, counts):
+        tokens = analyzer(doc)
+        known += n * sum(token in vocabulary for token in tokens)
+        total += n * len(tokens)
+    coverage['Short description'] = known / total if total else 1.0
+
+    encoder = preprocessor.named_transformers_['cat']
+    for col, categories in zip(encoder.feature_names_in_, encoder.categories_):
+        coverage[col] = float(X[col].isin(categories).mean()) if len(X) else 1.0
+    return coverage
+
+class FeatureStore:
+    """Vectorized training rows keyed by ticket ID, persisted with joblib.
+
+    Holds the sparse feature matrix the preprocessor produced for every
+    labeled ticket seen so far, so an incremental retrain only has to
+    vectorize new or relabeled tickets.
+    """
+
+    def __init__(self, path='models/feature_store.joblib'):
+        self.path = Path(path)
+        self.ids = np.array([], dtype=object)
+        self.X = None
+        self.y = np.array([], dtype=object)
+        self.signature = None
+        self.coverage = {}
+
+    def exists(self):
+        return self.path.exists()
+
+    def load(self):
+        state = joblib.load(self.path)
+        self.ids, self.X, self.y = state['ids'], state['X'], state['y']
+        self.signature, self.coverage = state['signature'], state['coverage']
+        return self
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({
+            'ids': self.ids,
+            'X': self.X,
+            'y': self.y,
+            'signature': self.signature,
+            'coverage': self.coverage,
+        }, self.path)
+        print(f"Feature store with {len(self.ids)} tickets saved to {self.path}")
+
+    def rebuild(self, preprocessor, ids, X, y):
+        """Replace the store with rows vectorized by a freshly fitted preprocessor"""
+        from scipy import sparse
+        self.ids = np.asarray(ids, dtype=object)
+        self.X = sparse.csr_matrix(preprocessor.transform(X))
+        self.y = np.asarray(y, dtype=object)
+        self.signature = preprocessor_signature(preprocessor)
+        self.coverage = feature_coverage(preprocessor, X)
+        return self
+
+    def is_new(self, ids, y):
+        """Mask of tickets not in the store yet or stored with a different label"""
+        stored = pd.Series(self.y, index=self.ids)
+        return (stored.reindex(ids).to_numpy() != np.asarray(y, dtype=object))
+
+    def update(self, ids, X, y):
+        """Append vectorized rows, replacing any stored rows with the same ID"""
+        from scipy import sparse
+        ids = np.asarray(ids, dtype=object)
+        keep = ~pd.Index(self.ids).isin(ids)
+        self.ids = np.concatenate([self.ids[keep], ids])
+        self.X = sparse.vstack([self.X[keep], sparse.csr_matrix(X)], format='csr')
+        self.y = np.concatenate([self.y[keep], np.asarray(y, dtype=object)])
+        return self
+
+    def drift(self, coverage):
+        """Largest coverage drop of new tickets compared with the training data"""
+        return max((self.coverage.get(col, 1.0) - value for col, value in coverage.items()), default=0.0)
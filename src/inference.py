@@ -0,0 +1,310 @@
+import json
+import re
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+NODE_ARRAYS = ['left', 'right', 'feature', 'threshold', 'value']
+
+# Rows per predict_proba call in predict_top_k; bounds the float64 class matrix
+PROBA_CHUNK_ROWS = 4096
+
+def _check_tfidf(tfidf):
+    """The NumPy predictor only reimplements the TfidfVectorizer options train() uses"""
+    unsupported = {
+        'analyzer': tfidf.analyzer != 'word',
+        'preprocessor': tfidf.preprocessor is not None,
+        'tokenizer': tfidf.tokenizer is not None,
+        'strip_accents': tfidf.strip_accents is not None,
+        'binary': tfidf.binary,
+        'sublinear_tf': tfidf.sublinear_tf,
+        'use_idf': not tfidf.use_idf,
+        'norm': tfidf.norm != 'l2',
+    }
+    bad = [name for name, flag in unsupported.items() if flag]
+    if bad:
+        raise ValueError(f"Cannot export TfidfVectorizer with non-default options: {bad}")
+
+def _category_maps(encoder, columns):
+    """Map every known category to its output column by transforming it on its own"""
+    maps = []
+    for j, categories in enumerate(encoder.categories_):
+        probe = np.full((len(categories), len(columns)), '\0unseen', dtype=object)
+        probe[:, j] = categories
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            encoded = encoder.transform(probe)
+        if hasattr(encoded, 'toarray'):
+            encoded = encoded.toarray()
+        mapping = {}
+        for value, row in zip(categories, encoded):
+            hot = np.flatnonzero(row)
+            if len(hot):
+                mapping[str(value)] = int(hot[0])
+        maps.append(mapping)
+    return maps
+
+def export_artifact(pipeline, output_dir, source_path=None):
+    """Flatten a fitted train() pipeline into JSON metadata plus .npy node arrays.
+
+    The TF-IDF vocabulary/idf, the one-hot category maps and every tree of
+    the forest (concatenated, with child indices offset) are written so
+    LightweightPredictor can memory-map them without importing sklearn.
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    forest = pipeline.named_steps['classifier']
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Output column layout of the ColumnTransformer
+    blocks = []
+    offset = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or name == 'remainder':
+            continue
+        if name == 'desc':
+            _check_tfidf(transformer)
+            terms = sorted(transformer.vocabulary_, key=transformer.vocabulary_.get)
+            np.save(output_dir / 'idf.npy', transformer.idf_)
+            stop_words = transformer.get_stop_words()
+            blocks.append({
+                'kind': 'tfidf',
+                'column': columns,
+                'offset': offset,
+                'terms': terms,
+                'lowercase': transformer.lowercase,
+                'token_pattern': transformer.token_pattern,
+                'ngram_range': list(transformer.ngram_range),
+                'stop_words': sorted(stop_words) if stop_words else None,
+            })
+            offset += len(terms)
+        elif name == 'cat':
+            maps = _category_maps(transformer, columns)
+            width = len(transformer.get_feature_names_out())
+            blocks.append({
+                'kind': 'onehot',
+                'columns': list(columns),
+                'offset': offset,
+                'maps': [{value: offset + col for value, col in m.items()} for m in maps],
+            })
+            offset += width
+        else:
+            raise ValueError(f"Unsupported transformer in pipeline: {name}")
+
+    # Concatenate the trees; leaves point to themselves so traversal can stop anywhere
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    node_offset = 0
+    max_depth = 0
+    for tree in forest.estimators_:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        ids = np.arange(t.node_count) + node_offset
+        left.append(np.where(is_leaf, -1, t.children_left + node_offset))
+        right.append(np.where(is_leaf, ids, t.children_right + node_offset))
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        proba = t.value[:, 0, :forest.n_classes_]
+        sums = proba.sum(axis=1)
+        if not np.allclose(sums[is_leaf], 1.0):
+            # Older sklearn stores weighted counts and normalizes in predict_proba
+            sums[sums == 0.0] = 1.0
+            proba = proba / sums[:, np.newaxis]
+        value.append(proba)
+        roots.append(node_offset)
+        node_offset += t.node_count
+        max_depth = max(max_depth, t.max_depth)
+
+    arrays = {
+        'left': np.concatenate(left).astype(np.int64),
+        'right': np.concatenate(right).astype(np.int64),
+        'feature': np.concatenate(feature).astype(np.int64),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'value': np.concatenate(value).astype(np.float64),
+    }
+    for name, array in arrays.items():
+        np.save(output_dir / f'{name}.npy', array)
+
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'n_features': offset,
+        'classes': [str(c) for c in forest.classes_],
+        'roots': roots,
+        'max_depth': max_depth,
+        'blocks': blocks,
+    }
+    if source_path is not None and Path(source_path).exists():
+        stat = Path(source_path).stat()
+        meta['source'] = {'path': str(source_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    with open(output_dir / 'meta.json', 'w') as f:
+        json.dump(meta, f)
+    print(f"Inference artifact exported to {output_dir}")
+    return output_dir
+
+def artifact_matches(artifact_dir, source_path):
+    """True if the artifact was exported from the current version of source_path"""
+    meta_path = Path(artifact_dir) / 'meta.json'
+    if not meta_path.exists() or not Path(source_path).exists():
+        return False
+    with open(meta_path) as f:
+        source = json.load(f).get('source')
+    stat = Path(source_path).stat()
+    return bool(source) and source['size'] == stat.st_size and source['mtime_ns'] == stat.st_mtime_ns
+
+class LightweightPredictor:
+    """NumPy-only replacement for Pipeline.predict on an exported artifact.
+
+    Reproduces the TF-IDF analyzer and l2 normalization, the one-hot
+    encoding with ignored unknowns and the forest's float32 split
+    comparisons, so predictions match the sklearn pipeline exactly.
+    """
+
+    def __init__(self, artifact_dir, chunk_size=4096):
+        self.artifact_dir = Path(artifact_dir)
+        self.chunk_size = chunk_size
+        with open(self.artifact_dir / 'meta.json') as f:
+            meta = json.load(f)
+        if meta.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact version {meta.get('version')}")
+        self.n_features = meta['n_features']
+        self.classes_ = np.array(meta['classes'], dtype=object)
+        self.roots = np.array(meta['roots'], dtype=np.int64)
+        self.blocks = meta['blocks']
+        self.nodes = {
+            name: np.load(self.artifact_dir / f'{name}.npy', mmap_mode='r')
+            for name in NODE_ARRAYS
+        }
+        self.idf = np.load(self.artifact_dir / 'idf.npy', mmap_mode='r')
+        for block in self.blocks:
+            if block['kind'] == 'tfidf':
+                block['vocabulary'] = {term: i for i, term in enumerate(block['terms'])}
+                block['stop_set'] = frozenset(block['stop_words'] or ())
+                block['pattern'] = re.compile(block['token_pattern'])
+
+    def __getstate__(self):
+        # Ship only the path to worker processes; they re-map the arrays themselves
+        return {'artifact_dir': self.artifact_dir, 'chunk_size': self.chunk_size}
+
+    def __setstate__(self, state):
+        self.__init__(state['artifact_dir'], state['chunk_size'])
+
+    def _analyze(self, doc, block):
+        """Same tokens as TfidfVectorizer's word analyzer"""
+        if block['lowercase']:
+            doc = doc.lower()
+        tokens = block['pattern'].findall(doc)
+        if block['stop_set']:
+            tokens = [w for w in tokens if w not in block['stop_set']]
+        min_n, max_n = block['ngram_range']
+        if max_n == 1:
+            return tokens
+        original = tokens
+        tokens = list(original) if min_n == 1 else []
+        n_original = len(original)
+        for n in range(max(min_n, 2), min(max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(" ".join(original[i:i + n]))
+        return tokens
+
+    def _fill_tfidf(self, X, docs, block):
+        vocabulary = block['vocabulary']
+        offset = block['offset']
+        idf = self.idf
+        for r, doc in enumerate(docs):
+            counts = {}
+            for token in self._analyze(doc, block):
+                j = vocabulary.get(token)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            if not counts:
+                continue
+            cols = sorted(counts)
+            # Accumulate in column order like sklearn's inplace l2 row normalization
+            values = [float(counts[j]) * idf[j] for j in cols]
+            norm = 0.0
+            for v in values:
+                norm += v * v
+            norm = np.sqrt(norm)
+            for j, v in zip(cols, values):
+                X[r, offset + j] = v / norm
+
+    def transform(self, X):
+        """Dense float32 feature matrix for a dataframe of the model's input columns"""
+        out = np.zeros((len(X), self.n_features), dtype=np.float32)
+        for block in self.blocks:
+            if block['kind'] == 'tfidf':
+                docs = X[block['column']].tolist()
+                if any(not isinstance(doc, str) for doc in docs):
+                    raise ValueError("np.nan is an invalid document, expected byte or unicode string.")
+                self._fill_tfidf(out, docs, block)
+            else:
+                for column, mapping in zip(block['columns'], block['maps']):
+                    cols = X[column].map(mapping).to_numpy(dtype=float, na_value=np.nan)
+                    known = ~np.isnan(cols)
+                    out[np.flatnonzero(known), cols[known].astype(np.int64)] = 1.0
+        return out
+
+    def _leaves(self, features):
+        """Leaf node of every (row, tree) pair, walking only the pairs not at a leaf yet"""
+        # Plain ndarray views of the memmaps index faster than np.memmap itself
+        left, right = np.asarray(self.nodes['left']), np.asarray(self.nodes['right'])
+        feature, threshold = np.asarray(self.nodes['feature']), np.asarray(self.nodes['threshold'])
+        n_rows, n_features = features.shape
+        n_trees = len(self.roots)
+        flat = features.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_base = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        active = np.flatnonzero(left[nodes] != -1)
+        while active.size:
+            current = nodes[active]
+            go_left = flat[row_base[active] + feature[current]] <= threshold[current]
+            nxt = np.where(go_left, left[current], right[current])
+            nodes[active] = nxt
+            active = active[left[nxt] != -1]
+        return nodes.reshape(n_rows, n_trees)
+
+    def _proba_chunks(self, X):
+        """(start row, class probabilities) per chunk_size rows of X"""
+        value = self.nodes['value']
+        for start in range(0, len(X), self.chunk_size):
+            chunk = X.iloc[start:start + self.chunk_size]
+            leaves = self._leaves(self.transform(chunk))
+            proba = np.zeros((len(chunk), len(self.classes_)), dtype=np.float64)
+            for t in range(leaves.shape[1]):
+                proba += value[leaves[:, t]]
+            proba /= leaves.shape[1]
+            yield start, proba
+
+    def predict_proba(self, X):
+        """Mean leaf class fractions over the trees, summed in tree order like the forest"""
+        result = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start, proba in self._proba_chunks(X):
+            result[start:start + len(proba)] = proba
+        return result
+
+    def predict(self, X):
+        # Only the argmax of each chunk is kept, not the whole probability matrix
+        best = np.empty(len(X), dtype=np.int64)
+        for start, proba in self._proba_chunks(X):
+            best[start:start + len(proba)] = np.argmax(proba, axis=1)
+        return self.classes_.take(best, axis=0)
+
+def predict_top_k(model, X, k, chunk_size=PROBA_CHUNK_ROWS):
+    """The k most likely classes and their float32 probabilities for every row.
+
+    Works for the sklearn pipeline and LightweightPredictor alike. Each
+    chunk's probabilities come from a single predict_proba call and only
+    the top k of them are kept, so the (rows x classes) matrix is never
+    built for the whole batch. Column 0 is what model.predict returns
+    (ties go to the first class, like argmax).
+    """
+    k = min(k, len(model.classes_))
+    labels = np.empty((len(X), k), dtype=object)
+    probs = np.empty((len(X), k), dtype=np.float32)
+    for start in range(0, len(X), chunk_size):
+        proba = model.predict_proba(X.iloc[start:start + chunk_size])
+        order = np.argsort(-proba, axis=1, kind='stable')[:, :k]
+        labels[start:start + len(proba)] = np.asarray(model.classes_, dtype=object).take(order)
+        probs[start:start + len(proba)] = np.take_along_axis(proba, order, axis=1)
+    return labels, probs
@@ -0,0 +1,123 @@
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from classifier import ServiceTagClassifier
+from utils.data_to_json import (SUMMARY_STORE, SummaryStore, build_service_summary, count_tickets, summary_from_counts,
+                                write_service_summary)
+from utils.charts import render_charts
+from utils.loaders import prediction_path
+from utils.timing import REPORT, profiled, span
+from utils.visualization import write_presentation, write_reports
+
+DEFAULT_DIRS = {
+    "processed": "data/processed",
+    "charts": "data/charts",
+    "reports": "data/reports",
+}
+
+def run(raw_csv: str, start_date: str = None, end_date: str = None, out_dirs: dict = None, chunksize: int = None,
+        n_jobs: int = None, encoding: str = None, fmt: str = "csv", export_csv: bool = False,
+        prediction_cache: bool = False, top_k: int = None, summary_store: str = str(SUMMARY_STORE), template: str = None,
+        report_ranges: list = None):
+    """Run prediction, summary, charts and PPTX in one process.
+
+    The raw export is read once and the predicted dataframe is handed
+    straight to the later stages instead of going through predictions.csv.
+    With chunksize the export is streamed instead and the later stages work
+    from the daily ticket counters, so the full frame is never in memory.
+    The export's daily counters are merged into summary_store (None turns
+    it off), and a dated summary and its previous period are read from
+    there, so the comparison does not depend on what the export holds.
+    report_ranges adds one report per (start, end) range from the store in
+    the same process, and template fills a .pptx template instead of
+    building every deck from scratch.
+    Stage timings are written to run_report.json next to the summary, even
+    when a stage fails.
+    """
+    dirs = {**DEFAULT_DIRS, **(out_dirs or {})}
+    processed_dir = Path(dirs["processed"])
+    REPORT.enable()
+    try:
+        with span("pipeline"):
+            return _run(raw_csv, start_date, end_date, dirs, chunksize, n_jobs, encoding, fmt, export_csv,
+                        prediction_cache, top_k, summary_store, template, report_ranges)
+    finally:
+        REPORT.write(processed_dir / "run_report.json")
+
+def _run(raw_csv, start_date, end_date, dirs, chunksize, n_jobs, encoding, fmt, export_csv, prediction_cache, top_k,
+         summary_store, template, report_ranges):
+    processed_dir = Path(dirs["processed"])
+    predictions_path = prediction_path(processed_dir / "predictions", fmt)
+
+    classifier = ServiceTagClassifier(n_jobs=n_jobs, encoding=encoding, prediction_cache=prediction_cache,
+                                      top_k=top_k)
+    if chunksize:
+        predictions = classifier.predict_chunked(raw_csv, predictions_path, chunksize, export_csv)
+    else:
+        predictions = classifier.predict(raw_csv, predictions_path, export_csv)
+    if predictions is None:
+        print("[ERROR] Prediction failed - stopping pipeline")
+        return None
+
+    if summary_store:
+        store = SummaryStore(summary_store)
+        store.update(predictions if chunksize else count_tickets(predictions), start_date, end_date)
+    if summary_store and start_date:
+        summary = store.summary(start_date, end_date, source_file=str(predictions_path))
+    elif chunksize:
+        summary = summary_from_counts(predictions, start_date, end_date, source_file=str(predictions_path))
+    else:
+        summary = build_service_summary(predictions, start_date, end_date, source_file=str(predictions_path))
+    if summary is None:
+        print("[ERROR] Summary failed - stopping pipeline")
+        return None
+    write_service_summary(summary, processed_dir / "service_summary.json")
+
+    # The store has the whole year for the monthly line, not just the export's weeks
+    monthly = store.monthly_counts(datetime.now().year) if summary_store else predictions
+    render_charts(summary.get("services", {}), dirs["charts"], monthly, n_jobs)
+    write_presentation(summary, dirs["reports"], dirs["charts"], template)
+
+    if report_ranges and not summary_store:
+        print("[WARNING] --report-ranges needs the summary store - skipping the extra reports")
+    elif report_ranges:
+        reports = {}
+        for range_start, range_end in report_ranges:
+            name = f"{range_start}_{range_end}"
+            reports[name] = store.summary(range_start, range_end, source_file=str(summary_store))
+            render_charts(reports[name].get("services", {}), Path(dirs["charts"]) / name, monthly, n_jobs)
+        write_reports(reports, dirs["reports"], dirs["charts"], template)
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the full service report pipeline in one process")
+    parser.add_argument("--input", required=True, help="Path to the raw unlabeled ServiceNow export")
+    parser.add_argument("--start-date", help="Start date in YYYY-MM-DD format", required=False)
+    parser.add_argument("--end-date", help="End date in YYYY-MM-DD format", required=False)
+    parser.add_argument("--processed-dir", default=DEFAULT_DIRS["processed"], help="Directory for predictions and summary")
+    parser.add_argument("--charts-dir", default=DEFAULT_DIRS["charts"], help="Directory to save charts")
+    parser.add_argument("--reports-dir", default=DEFAULT_DIRS["reports"], help="Directory to save PPT")
+    parser.add_argument("--chunksize", type=int, help="Stream the export in chunks of this many rows")
+    parser.add_argument("--encoding", help="Force the encoding of the raw export (detected and cached otherwise)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Format of the predictions file")
+    parser.add_argument("--export-csv", action="store_true", help="With --format parquet, also write predictions.csv")
+    parser.add_argument("--prediction-cache", action="store_true", help="Reuse tags of feature rows predicted in earlier runs")
+    parser.add_argument("--top-k", type=int, help="Also write the K most likely tags with their probabilities")
+    parser.add_argument("--summary-store", default=str(SUMMARY_STORE), help="SQLite store of daily ticket counts")
+    parser.add_argument("--no-summary-store", action="store_true", help="Summarize only the export, without the store")
+    parser.add_argument("--template", help="Fill this .pptx template (see visualization.py --build-template)")
+    parser.add_argument("--report-ranges", nargs="+", metavar="START:END",
+                        help="Also write one report per date range from the summary store")
+    parser.add_argument("--profile", help="Also cProfile the whole run and save the pstats dump to this path")
+    parser.add_argument("--n-jobs", type=int, help="Cores used to predict large exports and render charts")
+    args = parser.parse_args()
+
+    with profiled(args.profile):
+        run(args.input, args.start_date, args.end_date, {
+            "processed": args.processed_dir,
+            "charts": args.charts_dir,
+            "reports": args.reports_dir,
+        }, args.chunksize, args.n_jobs, args.encoding, args.format, args.export_csv, args.prediction_cache,
+            args.top_k, None if args.no_summary_store else args.summary_store, args.template,
+            [tuple(r.split(":", 1)) for r in args.report_ranges or []])
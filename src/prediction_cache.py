@@ -0,0 +1,77 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+
+import joblib
+
+def row_keys(X, salt=""):
+    """Hash of every cleaned feature row, the key predictions are cached under"""
+    prefix = [salt] if salt else []
+    return [
+        hashlib.blake2b("\x1f".join(prefix + list(map(str, row))).encode("utf-8"), digest_size=16).hexdigest()
+        for row in X.itertuples(index=False, name=None)
+    ]
+
+def model_stamp(model_path):
+    """(size, mtime_ns) of the model file; cached tags are only valid for the same file"""
+    stat = Path(model_path).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+class PredictionCache:
+    """Least recently used feature-row hash -> tag map, persisted with joblib.
+
+    Alerts and standard catalog requests repeat the same feature rows run
+    after run, so their tags are kept between runs. The cache remembers
+    which model file produced them and starts empty when that file changed.
+    """
+
+    def __init__(self, path='models/prediction_cache.joblib', max_entries=200000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.stamp = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, model_path):
+        """Load the saved entries if they came from the current model file"""
+        self.stamp = model_stamp(model_path)
+        self.entries = OrderedDict()
+        if self.path.exists():
+            try:
+                state = joblib.load(self.path)
+            except Exception as e:
+                print(f"[WARNING] Could not read prediction cache: {e}")
+                return self
+            if tuple(state['stamp']) == self.stamp:
+                self.entries = state['entries']
+            else:
+                print("[CACHE] Model changed - starting with an empty prediction cache")
+        return self
+
+    def save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            joblib.dump({'stamp': self.stamp, 'entries': self.entries}, self.path)
+        except OSError as e:
+            print(f"[WARNING] Could not write prediction cache: {e}")
+
+    def get_many(self, keys):
+        """Cached tag (or None) for every key, marking hits as recently used"""
+        tags = []
+        for key in keys:
+            tag = self.entries.get(key)
+            if tag is not None:
+                self.entries.move_to_end(key)
+            tags.append(tag)
+        found = sum(tag is not None for tag in tags)
+        self.hits += found
+        self.misses += len(keys) - found
+        return tags
+
+    def put_many(self, keys, tags):
+        for key, tag in zip(keys, tags):
+            self.entries[key] = tag
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -1,28 +1,85 @@
 # src/processing/split_services_only.py
 
-import pandas as pd
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pandas as pd
+
+try:
+    from utils.loaders import PREDICTION_FORMATS, PredictionWriter
+except ImportError:  # run as a script: python src/processing/split_predictions.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from utils.loaders import PREDICTION_FORMATS, PredictionWriter
+
+TAG_COLUMN = 'Predicted_Service_Tag'
+
 class ServiceFileSplitter:
-    def __init__(self, input_file: str, output_dir: str = "data/processed/by_service"):
-        self.input_file = input_file
+    """Split a predictions file into one file per service tag in a single pass.
+
+    The input (CSV or Parquet) is read whole or in chunks; every chunk is
+    grouped by tag once and each group is appended to that service's
+    writer, with the writers running in a thread pool. CSV output goes to
+    <tag>.csv, Parquet output to Hive-style service=<tag>/part-0.parquet
+    directories that pd.read_parquet(output_dir) reads back as one table
+    (with an extra 'service' column from the directory names).
+    """
+
+    def __init__(self, input_file: str, output_dir: str = "data/processed/by_service", fmt: str = "csv",
+                 chunksize: int = None, n_jobs: int = None):
+        self.input_file = Path(input_file)
         self.output_dir = Path(output_dir)
+        self.fmt = fmt
+        self.chunksize = chunksize
+        self.n_jobs = n_jobs
+
+    def _chunks(self):
+        """The input as dataframes of at most chunksize rows (one frame without chunksize)"""
+        if self.input_file.suffix == PREDICTION_FORMATS["parquet"]:
+            if not self.chunksize:
+                yield pd.read_parquet(self.input_file)
+                return
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(self.input_file).iter_batches(batch_size=self.chunksize):
+                yield batch.to_pandas()
+            return
+        # Text is kept as is, so every chunk (and file) writes the input's own values
+        if not self.chunksize:
+            yield pd.read_csv(self.input_file, dtype=str)
+            return
+        yield from pd.read_csv(self.input_file, dtype=str, chunksize=self.chunksize)
+
+    def _writer_path(self, tag):
+        tag_safe = self._make_filename_safe(tag)
+        if self.fmt == "parquet":
+            return self.output_dir / f"service={tag_safe}" / "part-0.parquet"
+        return self.output_dir / f"{tag_safe}.csv"
 
     def split_by_service(self):
-        df = pd.read_csv(self.input_file)
+        """Write every service's rows to its own file; returns rows written per tag"""
+        writers = {}
 
-        if 'Predicted_Service_Tag' not in df.columns:
-            raise ValueError("Missing 'Predicted_Service_Tag' column in the input file")
+        def write(tag, group):
+            if tag not in writers:
+                writers[tag] = PredictionWriter(self._writer_path(tag))
+            writers[tag].write(group)
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with ThreadPoolExecutor(max_workers=self.n_jobs or 1) as pool:
+                for chunk in self._chunks():
+                    if TAG_COLUMN not in chunk.columns:
+                        raise ValueError(f"Missing '{TAG_COLUMN}' column in the input file")
+                    # One groupby per chunk instead of one mask per tag; each tag's writer is used by one task at a time
+                    groups = chunk.groupby(chunk[TAG_COLUMN].astype(object), sort=False)
+                    list(pool.map(lambda item: write(*item), groups))
+        finally:
+            for writer in writers.values():
+                writer.close()
 
-        service_tags = df['Predicted_Service_Tag'].dropna().unique()
-        for tag in service_tags:
-            tag_safe = self._make_filename_safe(tag)
-            df_filtered = df[df['Predicted_Service_Tag'] == tag]
-            file_path = self.output_dir / f"{tag_safe}.csv"
-            df_filtered.to_csv(file_path, index=False)
-            print(f"✅ Saved {len(df_filtered)} rows to {file_path}")
+        for tag, writer in writers.items():
+            print(f"✅ Saved {writer.rows} rows to {writer.path}")
+        return {tag: writer.rows for tag, writer in writers.items()}
 
     def _make_filename_safe(self, name: str) -> str:
         return "".join(c if c.isalnum() else "_" for c in str(name))
@@ -32,9 +89,14 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Split predictions.csv into service-specific files")
-    parser.add_argument("--input", required=True, help="Path to predictions.csv file")
+    parser.add_argument("--input", required=True, help="Path to predictions.csv (or .parquet) file")
     parser.add_argument("--output", default="data/processed/by_service", help="Output directory path")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Per-service CSV files or a service=<tag>/ partitioned Parquet dataset")
+    parser.add_argument("--chunksize", type=int, help="Stream the input in chunks of this many rows")
+    parser.add_argument("--n-jobs", type=int, help="Threads writing the per-service files")
     args = parser.parse_args()
 
-    splitter = ServiceFileSplitter(input_file=args.input, output_dir=args.output)
+    splitter = ServiceFileSplitter(input_file=args.input, output_dir=args.output, fmt=args.format,
+                                   chunksize=args.chunksize, n_jobs=args.n_jobs)
     splitter.split_by_service()
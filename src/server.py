@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+from batcher import MicroBatcher
+from classifier import ServiceTagClassifier
+from utils.timing import LatencyWindow
+
+MAX_BATCH_ROWS = 50000
+RELOAD_INTERVAL = 2.0
+
+def _file_stamp(path):
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def _model_stamp(classifier):
+    """(size, mtime_ns) of the pickle and of the artifact metadata, None for a missing file.
+
+    train() writes the pickle before exporting the artifact, so watching
+    both switches back to the artifact once the export has finished.
+    """
+    return _file_stamp(classifier.model_path), _file_stamp(classifier.artifact_dir / 'meta.json')
+
+class PredictionService:
+    """A ServiceTagClassifier kept loaded between requests.
+
+    The model is loaded once and swapped for a fresh one when
+    models/service_tag_model.pkl changes on disk, so a retrain is picked
+    up without restarting. Requests are predicted concurrently with the
+    classifier current at their start; the lock only guards the model
+    swap and the counters, so /stats never waits for a prediction. The
+    latency of each request is kept for the /stats percentiles.
+    With micro_batch, rows from concurrent requests are merged by a
+    MicroBatcher running on its own event loop thread instead.
+    """
+
+    def __init__(self, use_artifact=True, reload_interval=RELOAD_INTERVAL, micro_batch=False,
+                 max_batch_size=64, max_wait_ms=5.0):
+        self.use_artifact = use_artifact
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()
+        self.latencies = LatencyWindow()
+        self.requests = 0
+        self.rows = 0
+        self.reloads = 0
+        self.classifier = None
+        self.stamp = None
+        self._stop = threading.Event()
+        self.batcher = None
+        self._loop = None
+        if not self.reload():
+            raise RuntimeError("Could not load the model - train it first")
+        if micro_batch:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="micro-batcher", daemon=True).start()
+            self.batcher = MicroBatcher(self.classifier, max_batch_size, max_wait_ms)
+            asyncio.run_coroutine_threadsafe(self.batcher.start(), self._loop).result()
+
+    def reload(self):
+        """Load the current model file into a new classifier and swap it in"""
+        # Per-request progress lines would flood the server log under load
+        classifier = ServiceTagClassifier(use_artifact=self.use_artifact, verbose=False)
+        stamp = _model_stamp(classifier)
+        try:
+            model = classifier.load_model()
+        except FileNotFoundError as e:
+            print(f"[SERVER] {e}")
+            return False
+        if model is None:
+            # Keep serving the previous model, e.g. while the pickle is still being written
+            return False
+        with self.lock:
+            self.classifier = classifier
+            self.stamp = stamp
+            if self.batcher is not None:
+                self.batcher.classifier = classifier
+            self.reloads += 1
+        print(f"[SERVER] Model loaded from {classifier.model_path} ({type(model).__name__})")
+        return True
+
+    def watch(self):
+        """Poll the model files and reload when their size or mtime changes"""
+        while not self._stop.wait(self.reload_interval):
+            stamp = _model_stamp(self.classifier)
+            if stamp[0] is not None and stamp != self.stamp:
+                print("[SERVER] Model file changed - reloading")
+                self.reload()
+
+    def start_watching(self):
+        thread = threading.Thread(target=self.watch, name="model-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+        if self.batcher is not None:
+            asyncio.run_coroutine_threadsafe(self.batcher.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def predict(self, df):
+        """Predicted_Service_Tag (after business rules) for a frame of ticket rows"""
+        with self.lock:
+            classifier = self.classifier
+        missing_cols = [col for col in classifier.features if col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}")
+
+        start = time.perf_counter()
+        if self.batcher is not None:
+            batched = self.batcher.predict_many(df.to_dict('records'))
+            tags = asyncio.run_coroutine_threadsafe(batched, self._loop).result()
+        else:
+            result = classifier.predict_frame(df)
+            if result is None:
+                raise RuntimeError("Prediction failed")
+            tags = result['Predicted_Service_Tag'].tolist()
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        self.latencies.add(latency_ms)
+        with self.lock:
+            self.requests += 1
+            self.rows += len(tags)
+        return tags, latency_ms
+
+    def stats(self):
+        with self.lock:
+            stats = {
+                "requests": self.requests,
+                "rows": self.rows,
+                "reloads": self.reloads,
+                "model": str(self.classifier.model_path),
+            }
+        latency_ms = self.latencies.percentiles()
+        if latency_ms is not None:
+            stats["latency_ms"] = latency_ms
+        if self.batcher is not None:
+            stats["micro_batch"] = self.batcher.metrics()
+        return stats
+
+def parse_rows(body, content_type):
+    """Ticket rows from a CSV body or a JSON list of row objects (optionally under "rows")"""
+    if not body.strip():
+        return pd.DataFrame()
+    if content_type.startswith("text/csv"):
+        return pd.read_csv(io.BytesIO(body), dtype=str)
+    rows = json.loads(body)
+    if isinstance(rows, dict):
+        rows = rows.get("rows", [rows])
+    if not isinstance(rows, list):
+        raise ValueError("Expected a list of rows")
+    return pd.DataFrame(rows, dtype=object)
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """POST /predict with rows, GET /stats for latency percentiles, GET /health"""
+
+    service = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.service.stats())
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            df = parse_rows(self.rfile.read(length), self.headers.get("Content-Type", "application/json"))
+            if df.empty:
+                raise ValueError("No rows to predict in the request body")
+            if len(df) > MAX_BATCH_ROWS:
+                raise ValueError(f"At most {MAX_BATCH_ROWS} rows per request")
+            ids = df["ID"].tolist() if "ID" in df.columns else None
+            tags, latency_ms = self.service.predict(df)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        payload = {"tags": tags, "latency_ms": round(latency_ms, 2)}
+        if ids is not None:
+            payload["ids"] = ids
+        self._send_json(200, payload)
+
+    def log_message(self, format, *args):
+        print(f"[SERVER] {format % args}")
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ThreadingHTTPServer equivalent listening on a Unix domain socket"""
+
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("unix", 0)
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None):
+    handler = type("Handler", (PredictionHandler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(host="127.0.0.1", port=8765, socket_path=None, use_artifact=True, reload_interval=RELOAD_INTERVAL,
+          micro_batch=False, max_batch_size=64, max_wait_ms=5.0):
+    """Load the model once and answer prediction requests until interrupted"""
+    service = PredictionService(use_artifact, reload_interval, micro_batch, max_batch_size, max_wait_ms)
+    server = make_server(service, host, port, socket_path)
+    service.start_watching()
+    print(f"[SERVER] Listening on {socket_path or f'http://{host}:{port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print(f"[SERVER] Stopped: {json.dumps(service.stats())}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve service tag predictions over local HTTP or a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP port")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL, help="Seconds between model file checks")
+    parser.add_argument("--no-artifact", action="store_true", help="Predict with the pickled sklearn pipeline instead of the artifact")
+    parser.add_argument("--micro-batch", action="store_true", help="Merge rows from concurrent requests into shared batches")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="With --micro-batch, most tickets per batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="With --micro-batch, longest a ticket waits for a batch to fill")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.socket, not args.no_artifact, args.reload_interval,
+          args.micro_batch, args.max_batch_size, args.max_wait_ms)
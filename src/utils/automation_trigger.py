@@ -34,10 +34,7 @@ if not latest_file:
 commands = [
     f'cd /d "{project_root}"',
     f'call "{env_activate}"',
-    f'python src/classifier.py --predict "data/raw/{latest_file}" --output "data/processed/predictions.csv"',
-    f'python src/utils/data_to_json.py --input data/processed/predictions.csv --start-date {start_date} --end-date {end_date}',
-    f'python src/utils/charts.py --input data/processed/service_summary.json --csv data/processed/predictions.csv --output data/charts',
-    f'python src/utils/visualization.py --input data/processed/service_summary.json --output data/reports/'
+    f'python src/pipeline.py --input "data/raw/{latest_file}" --start-date {start_date} --end-date {end_date}'
 ]
 
 full_command = " && ".join(commands)
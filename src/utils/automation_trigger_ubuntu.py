@@ -41,11 +41,9 @@ python_executable = "python" # Or the specific path if needed, but ideally inher
 # Build all commands into a single line
 # The 'cd' command is removed as run_automation.sh should handle the CWD.
 # The environment activation is removed as run_automation.sh should handle it.
+# src/pipeline.py runs prediction, summary, charts and PPT in one interpreter.
 commands = [
-    f'{python_executable} src/classifier.py --predict "data/raw/{latest_file}" --output "data/processed/predictions.csv"',
-    f'{python_executable} src/utils/data_to_json.py --input data/processed/predictions.csv --start-date {start_date} --end-date {end_date}',
-    f'{python_executable} src/utils/charts.py --input data/processed/service_summary.json --csv data/processed/predictions.csv --output data/charts',
-    f'{python_executable} src/utils/visualization.py --input data/processed/service_summary.json --output data/reports/'
+    f'{python_executable} src/pipeline.py --input "data/raw/{latest_file}" --start-date {start_date} --end-date {end_date}'
 ]
 
 full_command = " && ".join(commands)
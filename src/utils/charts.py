@@ -1,11 +1,26 @@
 import argparse
+import hashlib
 import json
+import os
+import shutil
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
 import pandas as pd
 from datetime import datetime
 
+try:
+    from .dates import parse_dates
+    from .data_to_json import SummaryStore, ticket_type
+    from .loaders import read_predictions
+    from .timing import REPORT
+except ImportError:  # run as a script: python src/utils/charts.py
+    from dates import parse_dates
+    from data_to_json import SummaryStore, ticket_type
+    from loaders import read_predictions
+    from timing import REPORT
+
 SERVICES = {
     "SIP": "SIP",
     "FLOW": "FLOW",
@@ -20,13 +35,82 @@ SERVICES = {
 
 RITM_ALLOWED = {"SIP", "CF", "MVM", "HV", "IFS"}
 
-COLORS = sns.color_palette("Set2")
+# matplotlib and seaborn take over a second to import, so they are only
+# loaded when a chart is actually drawn (not for cache hits or --help)
+PALETTE = "Set2"
+
+# PNGs are cached under a hash of the data they draw; bump STYLE_VERSION
+# whenever a chart's look changes so stale renders are not reused
+CHART_CACHE = Path("data/cache/charts")
+STYLE_VERSION = 1
+# Renders kept in the cache; the least recently used ones are deleted after each run
+CHART_CACHE_ENTRIES = 200
 
 def load_data(json_path):
     with open(json_path) as f:
         return json.load(f)
 
-def generate_volume_bar_chart(data, output_path):
+def _new_figure(figsize):
+    """Figure on its own Agg canvas, independent of pyplot's global state"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+def _chart_key(name, payload):
+    blob = json.dumps({
+        "chart": name,
+        "style": STYLE_VERSION,
+        "libs": [version("matplotlib"), version("seaborn")],
+        "data": payload,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+def _restore_cached(key, chart_path, cache_dir):
+    """Copy the cached render for key to chart_path; False if there is none"""
+    if cache_dir is None:
+        return False
+    cached = Path(cache_dir) / f"{key}.png"
+    try:
+        shutil.copyfile(cached, chart_path)
+        # mtime marks the last use, which prune_chart_cache keeps the newest of
+        os.utime(cached)
+    except FileNotFoundError:
+        return False
+    print(f"[CACHE] Reused {chart_path.name} (unchanged data)")
+    return True
+
+def _store_cached(key, chart_path, cache_dir):
+    if cache_dir is None:
+        return
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Copy then rename, so a parallel render never sees half a file
+    tmp = cache_dir / f"{key}.{os.getpid()}.tmp"
+    shutil.copyfile(chart_path, tmp)
+    os.replace(tmp, cache_dir / f"{key}.png")
+
+def prune_chart_cache(cache_dir, max_entries=CHART_CACHE_ENTRIES):
+    """Delete all but the max_entries most recently used renders; returns how many were deleted"""
+    if cache_dir is None or not Path(cache_dir).is_dir():
+        return 0
+    entries = []
+    for path in Path(cache_dir).glob("*.png"):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except FileNotFoundError:  # pruned by a concurrent run
+            continue
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        path.unlink(missing_ok=True)
+    removed = max(len(entries) - max_entries, 0)
+    if removed:
+        print(f"[CACHE] Removed {removed} old chart renders from {cache_dir}")
+    return removed
+
+def generate_volume_bar_chart(data, output_path, cache_dir=CHART_CACHE):
     services = []
     totals = []
 
@@ -36,19 +120,25 @@ def generate_volume_bar_chart(data, output_path):
             services.append(label)
             totals.append(stats.get("total_tickets", 0))
 
-    plt.figure(figsize=(10, 6))
-    sns.barplot(y=services, x=totals, palette=COLORS)
-    plt.xlabel("Total Tickets")
-    plt.ylabel("Service")
-    plt.title("Ticket Volume by Service")
-    plt.tight_layout()
-
     chart_path = output_path / "volume_by_service.png"
-    plt.savefig(chart_path)
-    plt.close()
+    key = _chart_key("volume_by_service", [services, totals])
+    if _restore_cached(key, chart_path, cache_dir):
+        return chart_path
+
+    import seaborn as sns
+    fig, ax = _new_figure((10, 6))
+    sns.barplot(y=services, x=totals, palette=sns.color_palette(PALETTE), ax=ax)
+    ax.set_xlabel("Total Tickets")
+    ax.set_ylabel("Service")
+    ax.set_title("Ticket Volume by Service")
+    fig.tight_layout()
+
+    fig.savefig(chart_path)
+    _store_cached(key, chart_path, cache_dir)
     print(f"[OK] Volume bar chart saved to {chart_path}")
+    return chart_path
 
-def generate_urgency_heatmap(data, output_path):
+def generate_urgency_heatmap(data, output_path, ticket_types=("INC", "RITM"), cache_dir=CHART_CACHE):
     urgency_levels = ["1 - High", "2 - Medium", "3 - Low"]
 
     def format_cell(pct, total):
@@ -75,106 +165,102 @@ def generate_urgency_heatmap(data, output_path):
                     df_ritm.loc[label, level] = format_cell(pct, ritm_count)
                     df_ritm_numeric.loc[label, level] = pct
 
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(df_inc_numeric.astype(float), annot=df_inc, fmt='', cmap="YlGnBu")
-    plt.title("Urgency Distribution for INC (% and Ticket Count)")
-    plt.tight_layout()
-    heatmap_inc_path = output_path / "urgency_heatmap_INC.png"
-    plt.savefig(heatmap_inc_path)
-    plt.close()
-    print(f"[OK] INC urgency heatmap saved to {heatmap_inc_path}")
-
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(df_ritm_numeric.astype(float), annot=df_ritm, fmt='', cmap="YlGnBu")
-    plt.title("Urgency Distribution for RITM (% and Ticket Count)")
-    plt.tight_layout()
-    heatmap_ritm_path = output_path / "urgency_heatmap_RITM.png"
-    plt.savefig(heatmap_ritm_path)
-    plt.close()
-    print(f"[OK] RITM urgency heatmap saved to {heatmap_ritm_path}")
-
-def generate_monthly_progress(csv_file, output_path):
-    try:
-        # Use low_memory=False to avoid mixed type warnings
-        df = pd.read_csv(csv_file, low_memory=False)
-    except Exception as e:
-        print(f"Failed to load predictions file: {e}")
-        return
-
-    if "Created" not in df or "ID" not in df:
-        print("Required columns not found in data")
-        return
-
-    # Custom date parsing function for the Created column
-    def parse_date(x):
-        if pd.isnull(x):
-            return pd.NaT
-            
+    tables = {"INC": (df_inc_numeric, df_inc), "RITM": (df_ritm_numeric, df_ritm)}
+    paths = []
+    for ticket_type in ticket_types:
+        numeric, annotations = tables[ticket_type]
+        heatmap_path = output_path / f"urgency_heatmap_{ticket_type}.png"
+        paths.append(heatmap_path)
+        key = _chart_key(f"urgency_heatmap_{ticket_type}", [numeric.to_dict(), annotations.to_dict()])
+        if _restore_cached(key, heatmap_path, cache_dir):
+            continue
+
+        import seaborn as sns
+        fig, ax = _new_figure((8, 6))
+        sns.heatmap(numeric.astype(float), annot=annotations, fmt='', cmap="YlGnBu", ax=ax)
+        ax.set_title(f"Urgency Distribution for {ticket_type} (% and Ticket Count)")
+        fig.tight_layout()
+        fig.savefig(heatmap_path)
+        _store_cached(key, heatmap_path, cache_dir)
+        print(f"[OK] {ticket_type} urgency heatmap saved to {heatmap_path}")
+    return paths
+
+def generate_monthly_progress(predictions, output_path, cache_dir=CHART_CACHE):
+    """Plot the monthly INC/RITM line from a predictions CSV path or dataframe.
+
+    A dataframe of count_tickets() counters (with a 'count' column) is also
+    accepted, which is what the chunked prediction mode hands over, and so
+    are SummaryStore.monthly_counts() rows ('month', 'type', 'count'),
+    which cover the whole year whatever weeks the export holds.
+    """
+    if isinstance(predictions, pd.DataFrame):
+        df = predictions
+    else:
         try:
-            # Handle Excel float dates
-            if isinstance(x, (float, int)) and x > 20000:
-                return pd.to_datetime('1899-12-30') + pd.to_timedelta(x, unit='D')
-                
-            # Try common date formats
-            date_formats = [
-                '%m/%d/%Y %H:%M',  # 5/15/2025 15:02
-                '%m/%d/%Y %H:%M:%S',  # 5/15/2025 15:02:30
-                '%Y-%m-%d %H:%M:%S',  # 2025-05-15 15:02:30
-                '%Y-%m-%d %H:%M',     # 2025-05-15 15:02
-                '%Y-%m-%d',           # 2025-05-15
-                '%m/%d/%Y',           # 5/15/2025
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    return pd.to_datetime(x, format=fmt)
-                except:
-                    continue
-                    
-            # Last resort: try pandas default parser
-            return pd.to_datetime(x)
-        except:
-            return pd.NaT
-    
-    # Apply custom parsing to Created column
-    df["Created"] = df["Created"].apply(parse_date)
-    df = df.dropna(subset=["Created"])
+            df = read_predictions(predictions, columns=["Created", "ID"])
+        except Exception as e:
+            print(f"Failed to load predictions file: {e}")
+            return
 
     try:
         current_year = datetime.now().year
-        df = df[df["Created"].dt.year == current_year]
-
-        df["month"] = df["Created"].dt.to_period("M")
-        df["type"] = df["ID"].apply(lambda x: "INC" if str(x).startswith("INC") else ("RITM" if str(x).startswith("RITM") else "OTHER"))
-        filtered = df[df["type"].isin(["INC", "RITM"])]
+        if "month" in df and "type" in df and "count" in df:
+            monthly = df[df["month"].astype(str).str.startswith(str(current_year))]
+        else:
+            if "count" in df and "day" in df and "type" in df:
+                df = df[["day", "type", "count"]].rename(columns={"day": "Created"})
+            elif "Created" not in df or "ID" not in df:
+                print("Required columns not found in data")
+                return
+            else:
+                df = df[["Created", "ID"]].copy()
+                df["Created"] = parse_dates(df["Created"])
+                df["type"] = ticket_type(df["ID"].astype(str))
+                df["count"] = 1
+            df = df[df["Created"].dt.year == current_year]
+            monthly = pd.DataFrame({
+                "month": df["Created"].dt.to_period("M").astype(str),
+                "type": df["type"].astype(str),
+                "count": df["count"],
+            })
+
+        filtered = monthly[monthly["type"].isin(["INC", "RITM"])]
 
         if filtered.empty:
             print("[WARNING] No valid data for monthly progress chart - skipping")
             return
 
-        summary = filtered.groupby(["month", "type"]).size().unstack(fill_value=0)
+        summary = filtered.groupby(["month", "type"])["count"].sum().unstack(fill_value=0)
         summary = summary.sort_index()
 
-        plt.figure(figsize=(10, 5))
+        line_path = output_path / "monthly_progress.png"
+        key = _chart_key("monthly_progress", {
+            "year": current_year,
+            "months": summary.index.astype(str).tolist(),
+            "series": {t: summary[t].tolist() for t in ["INC", "RITM"] if t in summary},
+        })
+        if _restore_cached(key, line_path, cache_dir):
+            return line_path
+
+        fig, ax = _new_figure((10, 5))
         for t in ["INC", "RITM"]:
             if t in summary:
-                plt.plot(summary.index.astype(str), summary[t], marker='o', label=t)
+                ax.plot(summary.index.astype(str), summary[t], marker='o', label=t)
 
-        plt.xlabel("Month")
-        plt.ylabel("Ticket Count")
-        plt.title(f"{current_year} Monthly Ticket Progress: INC vs RITM")
-        plt.legend()
-        plt.tight_layout()
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Ticket Count")
+        ax.set_title(f"{current_year} Monthly Ticket Progress: INC vs RITM")
+        ax.legend()
+        fig.tight_layout()
 
-        line_path = output_path / "monthly_progress.png"
-        plt.savefig(line_path)
-        plt.close()
+        fig.savefig(line_path)
+        _store_cached(key, line_path, cache_dir)
         print(f"[OK] Monthly progress chart saved to {line_path}")
+        return line_path
     except Exception as e:
         print(f"[ERROR] Failed to generate monthly progress chart: {e}")
-        plt.close()
 
-def generate_total_donut(data, output_path):
+def generate_total_donut(data, output_path, cache_dir=CHART_CACHE):
     total_inc = total_ritm = 0
 
     for stats in data.values():
@@ -194,38 +280,95 @@ def generate_total_donut(data, output_path):
     sizes = [total_ritm, total_inc]
     colors = ['#2ecc71', '#e67e22']
 
+    donut_path = output_path / "donut_total.png"
+    key = _chart_key("donut_total", [total_inc, total_ritm])
+    if _restore_cached(key, donut_path, cache_dir):
+        return donut_path
+
     try:
-        fig, ax = plt.subplots(figsize=(3.5, 3.5))
+        fig, ax = _new_figure((3.5, 3.5))
         wedges, texts = ax.pie(sizes, labels=labels, startangle=90,
                                colors=colors, wedgeprops={'width': 0.4})
 
-        plt.text(0, 0, f"{total_all}\nTotal", ha='center', va='center', fontsize=12, weight='bold')
-        plt.title("Total Tickets: INC vs RITM", fontsize=10)
+        ax.text(0, 0, f"{total_all}\nTotal", ha='center', va='center', fontsize=12, weight='bold')
+        ax.set_title("Total Tickets: INC vs RITM", fontsize=10)
 
-        donut_path = output_path / "donut_total.png"
-        plt.savefig(donut_path, bbox_inches='tight')
-        plt.close()
+        fig.savefig(donut_path, bbox_inches='tight')
+        _store_cached(key, donut_path, cache_dir)
         print(f"[OK] Donut chart saved to {donut_path}")
+        return donut_path
     except Exception as e:
         print(f"[ERROR] Failed to generate donut chart: {e}")
-        plt.close()
 
-def generate_charts(json_path: str, output_dir: str, csv_path: str):
+def _monthly_input(predictions):
+    """Only the columns the monthly chart reads, so workers get a small frame"""
+    if not isinstance(predictions, pd.DataFrame):
+        return predictions
+    for columns in (["month", "type", "count"], ["day", "type", "count"], ["Created", "ID"]):
+        if all(col in predictions for col in columns):
+            return predictions[columns]
+    return predictions
+
+def _render_timed(name, func, *args):
+    start, cpu = time.perf_counter(), time.process_time()
+    func(*args)
+    return name, (time.perf_counter() - start, time.process_time() - cpu)
+
+def render_charts(data: dict, output_dir: str, predictions, n_jobs: int = None, cache_dir=CHART_CACHE):
+    """Render every chart from the services section of a summary and the predictions.
+
+    Each chart draws on its own Figure, so with n_jobs > 1 they render
+    in a process pool at the same time. Charts whose data did not change
+    are copied from cache_dir (None disables the cache), which is then
+    pruned to its CHART_CACHE_ENTRIES most recently used renders. Returns
+    seconds spent per chart.
+    """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
+    tasks = [
+        ("volume_by_service", generate_volume_bar_chart, data, output_path, cache_dir),
+        ("urgency_heatmap_INC", generate_urgency_heatmap, data, output_path, ("INC",), cache_dir),
+        ("urgency_heatmap_RITM", generate_urgency_heatmap, data, output_path, ("RITM",), cache_dir),
+        ("monthly_progress", generate_monthly_progress, _monthly_input(predictions), output_path, cache_dir),
+        ("donut_total", generate_total_donut, data, output_path, cache_dir),
+    ]
+
+    if n_jobs is not None and n_jobs < 0:
+        # joblib convention: -1 is every core, -2 all but one, ...
+        n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+    if n_jobs and n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            timings = dict(pool.map(_render_timed, *zip(*tasks)))
+    else:
+        timings = dict(_render_timed(*task) for task in tasks)
+
+    # Charts may have rendered in worker processes, so they are added to the run report here
+    for name, (seconds, cpu_seconds) in timings.items():
+        REPORT.add(f"chart:{name}", seconds, cpu_seconds)
+        print(f"[TIME] {name}: {seconds:.2f}s")
+    prune_chart_cache(cache_dir)
+    return {name: seconds for name, (seconds, _) in timings.items()}
+
+def generate_charts(json_path: str, output_dir: str, csv_path: str = None, n_jobs: int = None, cache_dir=CHART_CACHE,
+                    store_path: str = None):
+    """Render the charts from a summary JSON; with store_path the monthly line comes from the summary store"""
     data = load_data(json_path).get("services", {})
-
-    generate_volume_bar_chart(data, output_path)
-    generate_urgency_heatmap(data, output_path)
-    generate_monthly_progress(csv_path, output_path)
-    generate_total_donut(data, output_path)
+    monthly = SummaryStore(store_path).monthly_counts(datetime.now().year) if store_path else csv_path
+    return render_charts(data, output_dir, monthly, n_jobs, cache_dir)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate advanced service charts")
     parser.add_argument("--input", required=True, help="Path to JSON summary file")
     parser.add_argument("--output", default="data/charts", help="Directory to save charts")
-    parser.add_argument("--csv", required=True, help="CSV file with predictions and Created/ID columns")
+    parser.add_argument("--csv", help="CSV or Parquet predictions file with Created/ID columns")
+    parser.add_argument("--store", help="Summary store to draw the year's monthly progress from (instead of --csv)")
+    parser.add_argument("--n-jobs", type=int, help="Render the charts in this many processes")
+    parser.add_argument("--cache-dir", default=str(CHART_CACHE), help="Where unchanged chart renders are reused from")
+    parser.add_argument("--no-cache", action="store_true", help="Always redraw every chart")
     args = parser.parse_args()
+    if not args.csv and not args.store:
+        parser.error("one of --csv or --store is required")
 
-    generate_charts(args.input, args.output, args.csv)
+    generate_charts(args.input, args.output, args.csv, args.n_jobs, None if args.no_cache else args.cache_dir,
+                    args.store)
@@ -3,119 +3,78 @@ import json
 from pathlib import Path
 from datetime import datetime, timedelta
 import argparse
-from dateutil import parser
-
-import pandas as pd
+import sqlite3
 import numpy as np
 
-def safe_parse(x):
-    if pd.isnull(x):
-        return pd.NaT
-
-    try:
-        # Handle Excel float dates (serial date like 45670.96182)
-        if isinstance(x, (float, int)) or (isinstance(x, str) and x.replace('.', '', 1).isdigit()):
-            # Convert string to float if needed
-            if isinstance(x, str):
-                x = float(x.strip())
-            
-            # Excel serial date starts from 1899-12-30
-            base_date = pd.to_datetime('1899-12-30')
-            # Separate days and fraction
-            days = int(x)
-            fraction = x - days
-            # Convert days to timedelta
-            date_part = base_date + pd.to_timedelta(days, unit='D')
-            # Convert fraction to hours/minutes/seconds
-            time_part = pd.to_timedelta(fraction * 24, unit='H')
-            # Combine date and time
-            return date_part + time_part
-        
-        # Handle MM/DD/YYYY HH:MM format explicitly
-        if isinstance(x, str):
-            # Try to match common date formats first
-            date_formats = [
-                '%m/%d/%Y %H:%M',  # 5/15/2025 15:02
-                '%m/%d/%Y %H:%M:%S',  # 5/15/2025 15:02:30
-                '%Y-%m-%d %H:%M:%S',  # 2025-05-15 15:02:30
-                '%Y-%m-%d %H:%M',     # 2025-05-15 15:02
-                '%Y-%m-%d',           # 2025-05-15
-                '%m/%d/%Y',           # 5/15/2025
-                '%d-%m-%Y %H:%M',     # 15-05-2025 15:02
-                '%d-%m-%Y'            # 15-05-2025
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    return pd.to_datetime(x, format=fmt)
-                except:
-                    continue
-        
-        # If all explicit formats fail, try fuzzy parsing as a last resort
-        return parser.parse(str(x), fuzzy=True)
-    except Exception as e:
-        print(f"[PARSE FAIL] {x}")
-        return pd.NaT
-
-def generate_service_summary(input_file: str, output_file: str = "data/processed/service_summary.json", start_date: str = None, end_date: str = None):
-    try:
-        df = pd.read_csv(input_file, low_memory=False)
-    except Exception as e:
-        print(f" Failed to read file: {e}")
-        return
+try:
+    from .dates import parse_dates
+    from .loaders import read_predictions
+    from .timing import span
+except ImportError:  # run as a script: python src/utils/data_to_json.py
+    from dates import parse_dates
+    from loaders import read_predictions
+    from timing import span
 
-    required_cols = {"ID", "Created", "Predicted_Service_Tag", "Urgency"}
-    missing = required_cols - set(df.columns)
-    if missing:
-        print(f" Missing required columns: {missing}")
-        return
+REQUIRED_COLUMNS = ["ID", "Created", "Predicted_Service_Tag", "Urgency"]
+TICKET_TYPES = ["INC", "RITM", "OTHER"]
 
-    df["Created"] = df["Created"].apply(safe_parse)
-    df["Predicted_Service_Tag"] = df["Predicted_Service_Tag"].str.upper()
+def ticket_type(ids: pd.Series) -> pd.Categorical:
+    """Classify ticket IDs as INC, RITM or OTHER from their prefix"""
+    inc = ids.str.startswith("INC", na=False)
+    ritm = ids.str.startswith("RITM", na=False)
+    return pd.Categorical(np.select([inc, ritm], ["INC", "RITM"], "OTHER"), categories=TICKET_TYPES)
 
-    # Convert input dates
-    start_dt = pd.to_datetime(start_date) if start_date else None
-    end_dt = pd.to_datetime(end_date) if end_date else None
+COUNT_KEYS = ["day", "Predicted_Service_Tag", "type", "Urgency"]
 
-    # Current period filter
-    current_df = df.copy()
-    if start_dt:
-        current_df = current_df[current_df["Created"] >= start_dt]
-    if end_dt:
-        current_df = current_df[current_df["Created"] <= end_dt]
+def summarize_periods(frame: pd.DataFrame) -> dict:
+    """Per-service stats for every value of the 'period' column in one groupby pass.
 
-    # Previous period filter
-    if start_dt and end_dt:
-        delta = end_dt - start_dt
-        prev_start = start_dt - delta
-        prev_end = end_dt - delta
-        prev_df = df[(df["Created"] >= prev_start) & (df["Created"] <= prev_end)]
-    else:
-        prev_df = pd.DataFrame(columns=df.columns)
-
-    def summarize(df_slice):
-        result = {}
-        for service in df_slice["Predicted_Service_Tag"].unique():
-            group = df_slice[df_slice["Predicted_Service_Tag"] == service]
-            total_tickets = len(group)
-            inc_count = group["ID"].str.startswith("INC").sum()
-            ritm_count = group["ID"].str.startswith("RITM").sum()
-            urgency_pct = group["Urgency"].value_counts(normalize=True).round(4) * 100
-            urgency_dist = urgency_pct.to_dict()
-
-            result[service] = {
-                "total_tickets": total_tickets,
-                "INC_count": int(inc_count),
-                "RITM_count": int(ritm_count),
-                "urgency_distribution": urgency_dist,
-                "first_ticket": group["Created"].min().isoformat() if not group["Created"].isnull().all() else None,
-                "last_ticket": group["Created"].max().isoformat() if not group["Created"].isnull().all() else None
-            }
-        return result
-
-    current_summary = summarize(current_df)
-    previous_summary = summarize(prev_df)
+    Rows are weighted by their 'count' column, so the frame can hold either
+    single tickets (count 1) or pre-aggregated ticket counts. Services keep
+    their order of first appearance and urgency levels are ordered like
+    value_counts (by count, ties in order of appearance).
+    """
+    keys = ["period", "Predicted_Service_Tag"]
+    frame = frame.assign(
+        inc=frame["count"].where(frame["type"] == "INC", 0),
+        ritm=frame["count"].where(frame["type"] == "RITM", 0),
+    )
+    stats = frame.groupby(keys, sort=False, observed=True).agg(
+        total_tickets=("count", "sum"),
+        INC_count=("inc", "sum"),
+        RITM_count=("ritm", "sum"),
+        first_ticket=("first", "min"),
+        last_ticket=("last", "max"),
+    )
+
+    urgency = (
+        frame.groupby(keys + ["Urgency"], sort=False, observed=True)["count"]
+        .sum()
+        .reset_index()
+    )
+    urgency["pct"] = (
+        urgency["count"] / urgency.groupby(keys, sort=False, observed=True)["count"].transform("sum")
+    ).round(4) * 100
+    urgency = urgency.sort_values("count", ascending=False, kind="stable")
+    distributions = {
+        key: dict(zip(group["Urgency"].tolist(), group["pct"].tolist()))
+        for key, group in urgency.groupby(keys, sort=False, observed=True)
+    }
+
+    result = {}
+    for (period, service), row in stats.iterrows():
+        first, last = row["first_ticket"], row["last_ticket"]
+        result.setdefault(period, {})[service] = {
+            "total_tickets": int(row["total_tickets"]),
+            "INC_count": int(row["INC_count"]),
+            "RITM_count": int(row["RITM_count"]),
+            "urgency_distribution": distributions.get((period, service), {}),
+            "first_ticket": first.isoformat() if not pd.isnull(first) else None,
+            "last_ticket": last.isoformat() if not pd.isnull(last) else None
+        }
+    return result
 
+def comparison_insights(current_summary: dict, previous_summary: dict) -> dict:
     insights = {}
     for service, current_stats in current_summary.items():
         prev_stats = previous_summary.get(service, {})
@@ -135,39 +94,391 @@ def generate_service_summary(input_file: str, output_file: str = "data/processed
             line = f"No previous data to compare for {service}"
 
         insights[service] = line
+    return insights
 
-    overall_total = len(current_df)
-    total_inc = current_df["ID"].str.startswith("INC").sum()
-    total_ritm = current_df["ID"].str.startswith("RITM").sum()
+def assemble_summary(current: pd.DataFrame, previous: pd.DataFrame, start_date: str = None, end_date: str = None, source_file: str = None) -> dict:
+    """Summary dict from the current and previous period rows (tickets or counts)"""
+    # Both periods go through a single groupby; a row in both periods counts in both
+    periods = summarize_periods(pd.concat([
+        current.assign(period="current"),
+        previous.assign(period="previous"),
+    ]))
+    current_summary = periods.get("current", {})
+    previous_summary = periods.get("previous", {})
+
+    overall_total = current["count"].sum()
+    total_inc = current["count"][current["type"] == "INC"].sum()
+    total_ritm = current["count"][current["type"] == "RITM"].sum()
 
     summary = {
         "generated_at": datetime.now().isoformat(),
-        "source_file": input_file,
+        "source_file": source_file,
         "date_range": {
             "start": start_date,
             "end": end_date
         },
         "services": current_summary,
         "overall": {
-            "total_tickets": overall_total,
+            "total_tickets": int(overall_total),
             "total_INC": int(total_inc),
             "total_RITM": int(total_ritm)
         },
-        "comparison": insights
+        "comparison": comparison_insights(current_summary, previous_summary)
     }
+    return summary
+
+def _prepare_tickets(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[REQUIRED_COLUMNS].copy()
+    df["Created"] = parse_dates(df["Created"])
+    df["Predicted_Service_Tag"] = df["Predicted_Service_Tag"].str.upper()
+    df["Urgency"] = df["Urgency"].astype("category")
+    df["type"] = ticket_type(df["ID"])
+    return df
+
+def build_service_summary(df: pd.DataFrame, start_date: str = None, end_date: str = None, source_file: str = None):
+    """Build the service summary dict from a predictions dataframe"""
+    with span("service_summary", rows=len(df)):
+        return _build_service_summary(df, start_date, end_date, source_file)
+
+def _build_service_summary(df, start_date, end_date, source_file):
+    missing = set(REQUIRED_COLUMNS) - set(df.columns)
+    if missing:
+        print(f" Missing required columns: {missing}")
+        return None
+
+    df = _prepare_tickets(df)
+    df["count"] = 1
+    df["first"] = df["last"] = df["Created"]
+
+    # Convert input dates
+    start_dt = pd.to_datetime(start_date) if start_date else None
+    end_dt = pd.to_datetime(end_date) if end_date else None
+
+    # Current period filter
+    current_mask = pd.Series(True, index=df.index)
+    if start_dt:
+        current_mask &= df["Created"] >= start_dt
+    if end_dt:
+        current_mask &= df["Created"] <= end_dt
+    current_df = df[current_mask]
+
+    # Previous period filter
+    if start_dt and end_dt:
+        delta = end_dt - start_dt
+        prev_start = start_dt - delta
+        prev_end = end_dt - delta
+        prev_df = df[(df["Created"] >= prev_start) & (df["Created"] <= prev_end)]
+    else:
+        prev_df = df.iloc[0:0]
+
+    return assemble_summary(current_df, prev_df, start_date, end_date, source_file)
+
+def count_tickets(df: pd.DataFrame, offset: int = 0) -> pd.DataFrame:
+    """Ticket counts per day, service, type and urgency with first/last Created.
+
+    These counters are small and additive, so they can be built chunk by
+    chunk and merged with combine_counts instead of keeping every ticket.
+    'midnight' counts the tickets created exactly at 00:00 (date-only
+    Created values), which the summary periods count at their edges.
+    'position' is the export row of the first ticket (rows of earlier
+    chunks are passed as offset), so summaries list services in the same
+    order as build_service_summary.
+    """
+    df = _prepare_tickets(df)
+    df["day"] = df["Created"].dt.normalize()
+    df["midnight"] = (df["Created"] == df["day"]).astype(int)
+    df["position"] = np.arange(offset, offset + len(df))
+    counts = df.groupby(COUNT_KEYS, sort=False, observed=True, dropna=False).agg(
+        count=("ID", "size"),
+        midnight=("midnight", "sum"),
+        first=("Created", "min"),
+        last=("Created", "max"),
+        position=("position", "min"),
+    )
+    return counts.reset_index()
+
+def combine_counts(frames) -> pd.DataFrame:
+    """Merge count frames from several chunks into one"""
+    counts = pd.concat(frames, ignore_index=True)
+    counts["Urgency"] = counts["Urgency"].astype(object)
+    counts["type"] = pd.Categorical(counts["type"], categories=TICKET_TYPES)
+    counts = counts.groupby(COUNT_KEYS, sort=False, observed=True, dropna=False).agg(
+        count=("count", "sum"),
+        midnight=("midnight", "sum"),
+        first=("first", "min"),
+        last=("last", "max"),
+        position=("position", "min"),
+    )
+    return counts.reset_index()
 
+def summary_from_counts(counts: pd.DataFrame, start_date: str = None, end_date: str = None, source_file: str = None):
+    """Build the service summary from count_tickets() counters.
+
+    The periods match build_service_summary: Created from start_date to
+    end_date (00:00 of that day, so only its midnight tickets) and the
+    previous period shifted back by end_date - start_date.
+    """
+    with span("service_summary", rows=len(counts)):
+        return _summary_from_counts(counts, start_date, end_date, source_file)
+
+def _at_midnight(counts, day):
+    """The counter rows of day cut down to their tickets created exactly at 00:00"""
+    rows = counts[(counts["day"] == day) & (counts["midnight"] > 0)]
+    return rows.assign(count=rows["midnight"], first=day, last=day)
+
+def _summary_from_counts(counts, start_date, end_date, source_file):
+    start_dt = pd.to_datetime(start_date).normalize() if start_date else None
+    end_dt = pd.to_datetime(end_date).normalize() if end_date else None
+    if "midnight" not in counts.columns:
+        counts = counts.assign(midnight=0)
+    if "position" not in counts.columns:
+        counts = counts.assign(position=np.arange(len(counts)))
+
+    # Whole days before end_dt, plus the tickets at exactly end_dt
+    current_mask = pd.Series(True, index=counts.index)
+    if start_dt:
+        current_mask &= counts["day"] >= start_dt
+    if end_dt:
+        current_mask &= counts["day"] < end_dt
+    current = counts[current_mask]
+    if end_dt:
+        # Back in export order, so services keep their order of first appearance
+        current = pd.concat([current, _at_midnight(counts, end_dt)]).sort_values("position", kind="stable")
+
+    if start_dt and end_dt:
+        delta = end_dt - start_dt
+        previous = pd.concat([
+            counts[(counts["day"] >= start_dt - delta) & (counts["day"] < start_dt)],
+            _at_midnight(counts, start_dt),
+        ])
+    else:
+        previous = counts.iloc[0:0]
+
+    return assemble_summary(current, previous, start_date, end_date, source_file)
+
+def write_counts(counts: pd.DataFrame, output_file: str):
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    counts.to_csv(output_path, index=False)
+    print(f"[OK] Ticket counts saved to {output_path}")
+
+def read_counts(input_file: str) -> pd.DataFrame:
+    counts = pd.read_csv(input_file, dtype={"Urgency": object, "Predicted_Service_Tag": object})
+    if "midnight" not in counts.columns:  # written before the column existed
+        counts["midnight"] = 0
+    if "position" not in counts.columns:  # rows were written in order of first appearance
+        counts["position"] = np.arange(len(counts))
+    for col in ["day", "first", "last"]:
+        counts[col] = pd.to_datetime(counts[col], format="ISO8601")
+    counts["type"] = pd.Categorical(counts["type"], categories=TICKET_TYPES)
+    return counts
+
+SUMMARY_STORE = Path("data/processed/daily_counts.sqlite")
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL,
+    service TEXT,
+    type TEXT NOT NULL,
+    urgency TEXT,
+    count INTEGER NOT NULL,
+    first TEXT,
+    last TEXT,
+    midnight INTEGER NOT NULL DEFAULT 0,
+    position INTEGER
+);
+CREATE INDEX IF NOT EXISTS daily_counts_day ON daily_counts (day);
+"""
+
+def _day(value) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+def _iso(values: pd.Series) -> pd.Series:
+    """Timestamps as ISO text with all their digits (down to nanoseconds), None for NaT"""
+    return values.map(lambda value: None if pd.isnull(value) else value.isoformat())
+
+class SummaryStore:
+    """Daily ticket counts (day x service x type x urgency) kept in SQLite across runs.
+
+    Every run merges the count_tickets() counters of its export, so
+    summaries and period comparisons for any date range are built from
+    stored daily rows without re-exporting older tickets. An export
+    replaces the stored days of the range it was pulled for (see update),
+    so re-tagged tickets are not counted twice.
+    """
+
+    def __init__(self, path=SUMMARY_STORE):
+        self.path = Path(path)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(STORE_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(daily_counts)")}
+        if "midnight" not in columns:  # store created before the column existed
+            conn.execute("ALTER TABLE daily_counts ADD COLUMN midnight INTEGER NOT NULL DEFAULT 0")
+        if "position" not in columns:
+            conn.execute("ALTER TABLE daily_counts ADD COLUMN position INTEGER")
+        return conn
+
+    def counts(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """Stored counters between two dates (inclusive), in count_tickets() format and export order"""
+        query = ("SELECT day, service, type, urgency, count, midnight, first, last, position "
+                 "FROM daily_counts WHERE 1 = 1")
+        params = []
+        if start_date is not None:
+            query += " AND day >= ?"
+            params.append(_day(start_date))
+        if end_date is not None:
+            query += " AND day <= ?"
+            params.append(_day(end_date))
+        query += " ORDER BY position, day"
+        conn = self._connect()
+        try:
+            counts = pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+        counts = counts.rename(columns={"service": "Predicted_Service_Tag", "urgency": "Urgency"})
+        for col in ["day", "first", "last"]:
+            counts[col] = pd.to_datetime(counts[col], format="ISO8601")
+        counts["type"] = pd.Categorical(counts["type"], categories=TICKET_TYPES)
+        return counts
+
+    def monthly_counts(self, year: int) -> pd.DataFrame:
+        """Tickets per month ('YYYY-MM') and type in one year, summed by SQLite"""
+        query = ("SELECT substr(day, 1, 7) AS month, type, SUM(count) AS count FROM daily_counts "
+                 "WHERE day >= ? AND day <= ? GROUP BY month, type ORDER BY month")
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(query, conn, params=[f"{year}-01-01", f"{year}-12-31"])
+        finally:
+            conn.close()
+
+    def update(self, counts: pd.DataFrame, start_date: str = None, end_date: str = None):
+        """Merge the counters of one export into the store.
+
+        Stored days from start_date to end_date (the export's last day when
+        omitted) are replaced by the export's counters. Days outside that
+        range are only added where the store has nothing yet, so an old
+        ticket reopened in a weekly export cannot wipe stored history.
+        Without start_date exactly the days present in the export are
+        replaced.
+        """
+        counts = counts[counts["day"].notna()]
+        if counts.empty:
+            return self
+        days = counts["day"].dt.strftime("%Y-%m-%d")
+        conn = self._connect()
+        try:
+            if start_date:
+                first_day, last_day = _day(start_date), _day(end_date) if end_date else days.max()
+                inside = (days >= first_day) & (days <= last_day)
+                stored = {day for (day,) in conn.execute("SELECT DISTINCT day FROM daily_counts")}
+                keep = inside | ~days.isin(stored)
+                skipped = days[~keep].nunique()
+                counts, days = counts[keep], days[keep]
+                # Kept days outside the range are not stored yet, nothing else to delete
+                replaced = []
+            else:
+                first_day, last_day = days.min(), days.max()
+                skipped = 0
+                replaced = sorted(set(days))
+
+            rows = pd.DataFrame({
+                "day": days,
+                "service": counts["Predicted_Service_Tag"].astype(object),
+                "type": counts["type"].astype(str),
+                "urgency": counts["Urgency"].astype(object),
+                "count": counts["count"].astype(int),
+                "midnight": counts["midnight"].astype(int) if "midnight" in counts.columns else 0,
+                "first": _iso(counts["first"]),
+                "last": _iso(counts["last"]),
+                "position": counts["position"].astype(int) if "position" in counts.columns else None,
+            }).astype(object)
+            rows = rows.where(rows.notna(), None)
+            with conn:
+                if start_date:
+                    conn.execute("DELETE FROM daily_counts WHERE day >= ? AND day <= ?", (first_day, last_day))
+                conn.executemany("DELETE FROM daily_counts WHERE day = ?", [(day,) for day in replaced])
+                conn.executemany("INSERT INTO daily_counts (day, service, type, urgency, count, midnight, first, last, position) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 rows.itertuples(index=False, name=None))
+        finally:
+            conn.close()
+        print(f"[OK] Summary store updated for {first_day} to {last_day} ({len(rows)} daily rows)")
+        if skipped:
+            print(f"[STORE] Kept the stored counts of {skipped} day(s) outside {first_day} to {last_day}")
+        return self
+
+    def summary(self, start_date: str, end_date: str = None, source_file: str = None):
+        """Service summary for a date range; the previous period is read from the store as well"""
+        start_dt = pd.to_datetime(start_date).normalize()
+        end_dt = pd.to_datetime(end_date).normalize() if end_date else None
+        load_from = start_dt - (end_dt - start_dt) if end_dt is not None else start_dt
+        return summary_from_counts(self.counts(load_from, end_dt), start_date, end_date, source_file=source_file)
+
+def write_service_summary(summary: dict, output_file: str = "data/processed/service_summary.json"):
     output_path = Path(output_file)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with open(output_path, "w") as f:
         json.dump(summary, f, indent=2)
     print(f"[OK] Service summary saved to {output_path}")
 
+def generate_service_summary(input_file: str, output_file: str = "data/processed/service_summary.json", start_date: str = None, end_date: str = None, counts_file: str = None, store_path: str = None):
+    """Summarize predictions (or counters), optionally through the daily summary store.
+
+    With store_path the input's counters are merged into the store first,
+    and when start_date is given the summary for the range is read from the
+    store. The input may then be omitted to summarize any stored range.
+    """
+    counts = df = None
+    if counts_file:
+        # Counters written by `classifier.py --chunksize`, no need to re-read predictions
+        try:
+            counts = read_counts(counts_file)
+        except Exception as e:
+            print(f" Failed to read counts file: {e}")
+            return
+    elif input_file:
+        try:
+            df = read_predictions(input_file, columns=REQUIRED_COLUMNS)
+        except Exception as e:
+            print(f" Failed to read file: {e}")
+            return
+
+    if store_path:
+        store = SummaryStore(store_path)
+        if df is not None:
+            counts = count_tickets(df)
+        if counts is not None:
+            store.update(counts, start_date, end_date)
+        if start_date:
+            summary = store.summary(start_date, end_date, source_file=input_file or counts_file or str(store.path))
+            write_service_summary(summary, output_file)
+            return summary
+
+    if counts is not None:
+        summary = summary_from_counts(counts, start_date, end_date, source_file=input_file or counts_file)
+    elif df is not None:
+        summary = build_service_summary(df, start_date, end_date, source_file=input_file)
+    else:
+        print(" Nothing to summarize: no input, counts or stored range given")
+        return
+    if summary is None:
+        return
+    write_service_summary(summary, output_file)
+    return summary
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate JSON summary from prediction file")
-    parser.add_argument("--input", required=True, help="Path to predictions CSV file")
+    parser.add_argument("--input", help="Path to predictions CSV or Parquet file")
+    parser.add_argument("--counts", help="Ticket counts CSV written by classifier.py --chunksize (used instead of --input)")
+    parser.add_argument("--store", help=f"Daily summary store to update and summarize from (e.g. {SUMMARY_STORE})")
     parser.add_argument("--output", default="data/processed/service_summary.json", help="Output JSON file path")
     parser.add_argument("--start-date", help="Start date in YYYY-MM-DD format", required=False)
     parser.add_argument("--end-date", help="End date in YYYY-MM-DD format", required=False)
     args = parser.parse_args()
+    if not args.input and not args.counts and not (args.store and args.start_date):
+        parser.error("one of --input or --counts is required (or --store with --start-date)")
 
-    generate_service_summary(args.input, args.output, args.start_date, args.end_date)
+    generate_service_summary(args.input, args.output, args.start_date, args.end_date, args.counts, args.store)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from dateutil import parser as date_parser
+
+# Formats seen in ServiceNow exports, tried in this order when a column mixes them
+DATE_FORMATS = [
+    '%m/%d/%Y %H:%M',     # 5/15/2025 15:02
+    '%m/%d/%Y %H:%M:%S',  # 5/15/2025 15:02:30
+    '%Y-%m-%d %H:%M:%S',  # 2025-05-15 15:02:30
+    '%Y-%m-%d %H:%M',     # 2025-05-15 15:02
+    '%Y-%m-%d',           # 2025-05-15
+    '%m/%d/%Y',           # 5/15/2025
+    '%d-%m-%Y %H:%M',     # 15-05-2025 15:02
+    '%d-%m-%Y'            # 15-05-2025
+]
+
+# Excel serial dates count days from 1899-12-30
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_MAX_SERIAL = pd.Timedelta.max.days
+
+SERIAL_PATTERN = r'(?=.*\d)\d*\.?\d*'
+
+def _excel_serial_to_datetime(serials):
+    """Convert an array of Excel serial floats, splitting days and day fraction like Excel does"""
+    serials = np.asarray(serials, dtype=float)
+    days = np.trunc(serials)
+    fraction = serials - days
+    return (
+        EXCEL_EPOCH
+        + pd.to_timedelta(days, unit='D')
+        + pd.to_timedelta(fraction * 24, unit='h')
+    )
+
+def _fuzzy_parse(x):
+    try:
+        parsed = date_parser.parse(str(x), fuzzy=True)
+        return parsed.replace(tzinfo=None)
+    except Exception:
+        return pd.NaT
+
+def detect_format(text, sample_size=500):
+    """Return DATE_FORMATS ordered by how many rows of a sample each one parses"""
+    if len(text) > sample_size:
+        text = text.sample(sample_size, random_state=0)
+    hits = {
+        fmt: pd.to_datetime(text, format=fmt, errors='coerce').notna().sum()
+        for fmt in DATE_FORMATS
+    }
+    return sorted(DATE_FORMATS, key=lambda fmt: -hits[fmt])
+
+def parse_dates(values, sample_size=500, return_stats=False, verbose=True):
+    """Parse a column of mixed ServiceNow dates into datetime64.
+
+    The dominant format is detected on a sample and applied to the whole
+    column in one vectorized call. Excel serial numbers are converted with
+    array arithmetic, and only the rows left over go to the other formats
+    and finally to dateutil's fuzzy parser.
+    """
+    values = pd.Series(values)
+    index = values.index
+    values = values.reset_index(drop=True)
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    stats = {}
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        result[:] = values
+        stats['datetime'] = int(values.notna().sum())
+    else:
+        pending = values.notna()
+
+        # Excel serial dates, either numeric or digit-only strings
+        if pd.api.types.is_numeric_dtype(values):
+            serial = pending.copy()
+            numbers = values.astype(float)
+        else:
+            text = values[pending].astype(str).str.strip()
+            is_serial = text.str.fullmatch(SERIAL_PATTERN)
+            serial = pd.Series(False, index=values.index)
+            serial[is_serial[is_serial].index] = True
+            numbers = pd.to_numeric(text[is_serial], errors='coerce').reindex(values.index)
+        if serial.any():
+            in_range = serial & (numbers >= 0) & (numbers < EXCEL_MAX_SERIAL)
+            result[in_range] = _excel_serial_to_datetime(numbers[in_range]).values
+            stats['excel_serial'] = int(in_range.sum())
+            pending &= ~serial
+
+        # Explicit formats, most common one first, each applied only to what is left
+        if pending.any():
+            text = values[pending].astype(str).str.strip()
+            for fmt in detect_format(text, sample_size):
+                if text.empty:
+                    break
+                parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+                hit = parsed.notna()
+                if hit.any():
+                    result[hit[hit].index] = parsed[hit]
+                    stats[fmt] = int(hit.sum())
+                    text = text[~hit]
+
+            # Anything still unparsed goes through the slow fuzzy parser
+            if not text.empty:
+                fuzzy = text.map(_fuzzy_parse)
+                ok = fuzzy.notna()
+                if ok.any():
+                    result[ok[ok].index] = pd.to_datetime(fuzzy[ok])
+                stats['fuzzy'] = int(ok.sum())
+
+    failed = int(values.notna().sum() - result.notna().sum())
+    if failed:
+        stats['failed'] = failed
+
+    if verbose:
+        report = ", ".join(f"{path}={count}" for path, count in stats.items()) or "no values"
+        print(f"[DATES] Parsed {len(values)} rows: {report}")
+
+    result.index = index
+    if return_stats:
+        return result, stats
+    return result
@@ -0,0 +1,208 @@
+import codecs
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .dates import parse_dates
+except ImportError:  # run as a script: python src/utils/loaders.py
+    from dates import parse_dates
+
+ENCODING_CACHE = Path("data/cache/encodings.json")
+SAMPLE_BYTES = 100000
+BLOCK_BYTES = 1 << 20
+
+# chardet guesses below this confidence (typical for mostly-ASCII exports) are
+# ignored and the Windows code page ServiceNow exports use is tried instead
+MIN_CONFIDENCE = 0.5
+FALLBACK_ENCODINGS = ["cp1252"]
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+def _decodes(blocks, encoding):
+    """True if the byte blocks decode with encoding, without keeping the text"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for block in blocks:
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def _blocks(path, data=None):
+    """The file (or its already read bytes) in BLOCK_BYTES pieces"""
+    if data is not None:
+        view = memoryview(data)
+        for i in range(0, len(data), BLOCK_BYTES):
+            yield view[i:i + BLOCK_BYTES]
+        return
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(BLOCK_BYTES), b"")
+
+def _sniff(path, data=None):
+    """BOM, then a full utf-8 check, then chardet/cp1252 (verified on the whole file), then latin1"""
+    if data is not None:
+        sample = bytes(data[:SAMPLE_BYTES])
+    else:
+        with open(path, "rb") as f:
+            sample = f.read(SAMPLE_BYTES)
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if _decodes(_blocks(path, data), "utf-8"):
+        return "utf-8"
+
+    import chardet
+    guess = chardet.detect(sample)
+    print(f"Detected encoding: {guess['encoding']} (confidence: {guess['confidence']})")
+    candidates = FALLBACK_ENCODINGS
+    if guess["encoding"] and guess["confidence"] >= MIN_CONFIDENCE:
+        candidates = [guess["encoding"].lower()] + candidates
+    for encoding in candidates:
+        if encoding not in ("ascii", "utf-8") and _decodes(_blocks(path, data), encoding):
+            return encoding
+    # latin1 maps every byte, so it always decodes
+    return "latin1"
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def detect_encoding(path, encoding=None, data=None, cache_path=ENCODING_CACHE):
+    """Encoding of a CSV file, cached per (path, size, mtime).
+
+    A forced encoding is returned as is. Otherwise the cache in
+    data/cache/encodings.json is consulted and the file is only sniffed
+    when it is new or changed. Pass the already read bytes as data to
+    sniff from memory instead of reading the file again.
+    """
+    if encoding:
+        return encoding
+
+    path = Path(path)
+    stat = path.stat()
+    key = str(path.resolve())
+    cache = _load_cache(cache_path)
+    entry = cache.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["encoding"]
+
+    encoding = _sniff(path, data)
+    cache[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "encoding": encoding}
+    try:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"[WARNING] Could not write encoding cache: {e}")
+    return encoding
+
+def load_csv(path, encoding=None, chunksize=None, cache_path=ENCODING_CACHE, **kwargs):
+    """Read a CSV export once with a detected (or forced) encoding.
+
+    The file's bytes are read a single time and both encoding detection
+    and parsing work from that buffer. With chunksize the file is streamed
+    instead and a chunk iterator is returned, as with pd.read_csv.
+    """
+    if chunksize:
+        encoding = detect_encoding(path, encoding, cache_path=cache_path)
+        print(f"Streaming with {encoding} encoding")
+        return pd.read_csv(path, encoding=encoding, chunksize=chunksize, **kwargs)
+
+    data = Path(path).read_bytes()
+    encoding = detect_encoding(path, encoding, data=data, cache_path=cache_path)
+    df = pd.read_csv(io.BytesIO(data), encoding=encoding, **kwargs)
+    print(f"Successfully read with {encoding} encoding")
+    return df
+
+# Predictions are written as CSV or Parquet depending on the file suffix
+PREDICTION_FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+CATEGORICAL_COLUMNS = ["Predicted_Service_Tag", "Urgency"]
+
+def prediction_path(output_path, fmt="csv"):
+    """output_path with the suffix of the given predictions format"""
+    return Path(output_path).with_suffix(PREDICTION_FORMATS[fmt])
+
+def typed_predictions(df):
+    """Copy of a predictions frame with parsed Created, categorical tags/urgency and string text"""
+    typed = {}
+    for col in df.columns:
+        if col == "Created":
+            typed[col] = parse_dates(df[col], verbose=False)
+        elif col in CATEGORICAL_COLUMNS:
+            typed[col] = pd.Categorical(df[col].astype("string"))
+        elif not pd.api.types.is_numeric_dtype(df[col]):
+            # Explicit string type so an all-empty column in one chunk keeps the schema
+            typed[col] = df[col].astype("string")
+        else:
+            typed[col] = df[col]
+    return pd.DataFrame(typed, index=df.index)
+
+def read_predictions(path, columns=None):
+    """Read a predictions CSV or Parquet file, only loading the given columns"""
+    path = Path(path)
+    if path.suffix == PREDICTION_FORMATS["parquet"]:
+        if columns is not None:
+            import pyarrow.parquet as pq
+            available = set(pq.read_schema(path).names)
+            columns = [col for col in columns if col in available]
+        return pd.read_parquet(path, columns=columns)
+    usecols = (lambda col: col in columns) if columns is not None else None
+    return pd.read_csv(path, usecols=usecols, low_memory=False)
+
+class PredictionWriter:
+    """Write prediction frames chunk by chunk to CSV or Parquet (by suffix).
+
+    Parquet files keep typed columns, so downstream stages get datetime64
+    Created and categorical tags without re-parsing strings.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.parquet = self.path.suffix == PREDICTION_FORMATS["parquet"]
+        self.rows = 0
+        self._writer = None
+
+    def write(self, df):
+        if self.rows == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                table = pa.Table.from_pandas(typed_predictions(df), preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(typed_predictions(df), schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=(self.rows == 0),
+                      index=False, encoding="utf-8")
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_predictions(df, path):
+    with PredictionWriter(path) as writer:
+        writer.write(df)
+    return Path(path)
@@ -0,0 +1,181 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Detailed spans kept per run; the per-stage totals always cover every span
+MAX_SPANS = 10000
+# Latency percentiles are computed over the most recent LATENCY_WINDOW calls
+LATENCY_WINDOW = 10000
+
+def peak_rss_mb(who="self"):
+    """Peak resident memory of this process (or its finished children) in MB, None on Windows"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class Span:
+    """One timed stage; set .rows inside the with block when the count is only known there"""
+
+    __slots__ = ("name", "depth", "rows", "start", "seconds", "cpu_seconds", "peak_rss_mb")
+
+    def __init__(self, name, depth, rows=None):
+        self.name = name
+        self.depth = depth
+        self.rows = rows
+        self.start = None
+        self.seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_mb = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class RunReport:
+    """Wall time, CPU time, peak RSS and row counts of the stages of one run.
+
+    Recording is off until enable() is called (the pipeline does), so
+    library use and the prediction server pay nothing for the spans.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.totals = {}
+        self.started = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.spans = []
+        self.totals = {}
+        self.started = time.perf_counter()
+        return self
+
+    @contextmanager
+    def span(self, name, rows=None):
+        if not self.enabled:
+            yield Span(name, 0, rows)
+            return
+        stack = self._local.__dict__.setdefault("stack", [])
+        span = Span(name, len(stack), rows)
+        stack.append(span)
+        span.start = round(time.perf_counter() - self.started, 4)
+        start, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield span
+        finally:
+            span.seconds = round(time.perf_counter() - start, 4)
+            span.cpu_seconds = round(time.process_time() - cpu, 4)
+            span.peak_rss_mb = peak_rss_mb()
+            stack.pop()
+            self._record(span)
+
+    def add(self, name, seconds, cpu_seconds=None, rows=None):
+        """Record a stage measured elsewhere, e.g. in a worker process"""
+        if not self.enabled:
+            return
+        span = Span(name, 0, rows)
+        span.seconds = round(seconds, 4)
+        span.cpu_seconds = None if cpu_seconds is None else round(cpu_seconds, 4)
+        self._record(span)
+
+    def _record(self, span):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append(span)
+            total = self.totals.setdefault(span.name, {"calls": 0, "seconds": 0.0, "cpu_seconds": 0.0, "rows": None})
+            total["calls"] += 1
+            total["seconds"] = round(total["seconds"] + span.seconds, 4)
+            total["cpu_seconds"] = round(total["cpu_seconds"] + (span.cpu_seconds or 0.0), 4)
+            if span.rows is not None:
+                total["rows"] = (total["rows"] or 0) + span.rows
+
+    def to_dict(self):
+        return {
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - self.started, 4) if self.started is not None else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb("children"),
+            "stages": self.totals,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"[OK] Run report saved to {path}")
+        return path
+
+REPORT = RunReport()
+span = REPORT.span
+
+def timed(name=None):
+    """Decorator form of span(); the stage is named after the function by default"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class LatencyWindow:
+    """Latencies (ms) of the most recent LATENCY_WINDOW calls, safe to add to from any thread"""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, latency_ms):
+        with self._lock:
+            self._values.append(latency_ms)
+
+    def __len__(self):
+        return len(self._values)
+
+    def percentiles(self):
+        """p50/p90/p99/max in ms and the number of calls they cover, None before the first call"""
+        with self._lock:
+            latencies = np.array(self._values)
+        if not len(latencies):
+            return None
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]).tolist()
+        return {
+            "p50": round(p50, 2), "p90": round(p90, 2), "p99": round(p99, 2),
+            "max": round(float(latencies.max()), 2), "window": len(latencies),
+        }
+
+@contextmanager
+def profiled(path):
+    """cProfile everything in the block and dump pstats to path (snakeviz, gprof2dot, flameprof)"""
+    if not path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        print(f"[OK] Profile saved to {path}")
@@ -1,12 +1,38 @@
 import argparse
+import copy
+import io
 import json
+import re
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-import matplotlib.pyplot as plt
 from pptx import Presentation
 from pptx.util import Inches, Pt
-from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.shapes import MSO_SHAPE, MSO_SHAPE_TYPE
 from pptx.dml.color import RGBColor
 
+try:
+    from .timing import timed
+except ImportError:  # run as a script: python src/utils/visualization.py
+    from timing import timed
+
+# Charts are embedded at this resolution of their size on the slide, not at the size matplotlib drew them
+IMAGE_DPI = 150
+
+# Shape names the template mode fills; the default layout sets them too, so any deck built from it is a template
+TABLE_SHAPE = "table:services"
+INSIGHTS_SHAPE = "text:insights"
+CHART_SHAPE = "chart:"
+# Figure sizes in charts.py; placeholder images get the same shape so pictures sized by height keep their width
+CHARTS = {
+    "urgency_heatmap_INC": (8, 6),
+    "urgency_heatmap_RITM": (8, 6),
+    "donut_total": (3.5, 3.5),
+    "volume_by_service": (10, 6),
+    "monthly_progress": (10, 5),
+}
+SERVICE_ORDER = ["SIP", "FLOW", "AUTO", "AD", "IW", "CF", "MVM", "HV", "IFS"]
+
 def map_service_name(name):
     mapping = {
         "AUTO": "Terminal Automation",
@@ -18,7 +44,50 @@ def map_service_name(name):
     }
     return mapping.get(name.upper(), name)
 
-def add_summary_slide(prs, data, overall):
+def service_rows(data):
+    """Table body of the summary slide: one row per service in SERVICE_ORDER, then the totals"""
+    rows = []
+    total_inc = total_ritm = 0
+    for s in SERVICE_ORDER:
+        stats = data.get(s.upper(), {})
+        inc = int(stats.get("INC_count", 0) or 0)
+        ritm = int(stats.get("RITM_count", 0) or 0)
+        total_inc += inc
+        total_ritm += ritm
+        rows.append([map_service_name(s), str(inc), str(ritm), str(inc + ritm)])
+    rows.append(["Total", str(total_inc), str(total_ritm), str(total_inc + total_ritm)])
+    return rows
+
+def image_stream(path, width=None, height=None, dpi=IMAGE_DPI):
+    """The image at path, scaled down to width x height (EMU) at dpi; never scaled up"""
+    return io.BytesIO(_scaled_png(str(path), Path(path).stat().st_mtime_ns, width, height, dpi))
+
+@lru_cache(maxsize=64)
+def _scaled_png(path, mtime_ns, width, height, dpi):
+    # Cached by file and box, so reports sharing a chart scale it once
+    from PIL import Image  # python-pptx depends on Pillow
+    with Image.open(path) as image:
+        scales = [size / Inches(1) * dpi / pixels
+                  for size, pixels in ((width, image.width), (height, image.height)) if size]
+        # The larger scale, so neither side ends up below its display resolution
+        scale = max(scales, default=1.0)
+        if scale >= 1.0:
+            return Path(path).read_bytes()
+        resized = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                               Image.LANCZOS)
+    stream = io.BytesIO()
+    resized.save(stream, format="PNG")
+    return stream.getvalue()
+
+def _add_chart(slide, charts_dir, name, left, top, width=None, height=None):
+    path = Path(charts_dir) / f"{name}.png"
+    if not path.exists():
+        return None
+    picture = slide.shapes.add_picture(image_stream(path, width, height), left, top, width=width, height=height)
+    picture.name = CHART_SHAPE + name
+    return picture
+
+def add_summary_slide(prs, data, overall, charts_dir="data/charts"):
     prs.slide_width = Inches(13.33)
     prs.slide_height = Inches(7.5)
     slide_layout = prs.slide_layouts[6]
@@ -28,44 +97,24 @@ def add_summary_slide(prs, data, overall):
     table_top = Inches(3.05)
     table_width = Inches(7.47)
     table_height = Inches(4.04)
-    table = slide.shapes.add_table(11, 4, table_left, table_top, table_width, table_height).table
+    table_shape = slide.shapes.add_table(11, 4, table_left, table_top, table_width, table_height)
+    table_shape.name = TABLE_SHAPE
+    table = table_shape.table
 
     headers = ["Services", "Incidents", "Requests", "Total Tickets"]
     for i, h in enumerate(headers):
         table.cell(0, i).text = h
         table.cell(0, i).text_frame.paragraphs[0].font.bold = True
 
-    order = ["SIP", "FLOW", "AUTO", "AD", "IW", "CF", "MVM", "HV", "IFS"]
-    total_inc = total_ritm = total_all = 0
-
-    for i, s in enumerate(order):
-        stats = data.get(s.upper(), {})
-        inc = int(stats.get("INC_count", 0) or 0)
-        ritm = int(stats.get("RITM_count", 0) or 0)
-        total = inc + ritm
-        total_inc += inc
-        total_ritm += ritm
-        total_all += total
-        table.cell(i + 1, 0).text = map_service_name(s)
-        table.cell(i + 1, 1).text = str(inc)
-        table.cell(i + 1, 2).text = str(ritm)
-        table.cell(i + 1, 3).text = str(total)
-
-    table.cell(10, 0).text = "Total"
-    table.cell(10, 1).text = str(total_inc)
-    table.cell(10, 2).text = str(total_ritm)
-    table.cell(10, 3).text = str(total_all)
+    for i, row in enumerate(service_rows(data)):
+        for j, value in enumerate(row):
+            table.cell(i + 1, j).text = value
     for i in range(4):
         table.cell(10, i).text_frame.paragraphs[0].font.bold = True
 
-    if Path("data/charts/urgency_heatmap_INC.png").exists():
-        slide.shapes.add_picture("data/charts/urgency_heatmap_INC.png", Inches(10.51), Inches(0.43), width=Inches(2.77), height=Inches(2.15))
-
-    if Path("data/charts/urgency_heatmap_RITM.png").exists():
-        slide.shapes.add_picture("data/charts/urgency_heatmap_RITM.png", Inches(5.44), Inches(0.48), width=Inches(2.64), height=Inches(2.05))
-
-    if Path("data/charts/donut_total.png").exists():
-        slide.shapes.add_picture("data/charts/donut_total.png", Inches(8.03), Inches(0.43), width=Inches(2.51), height=Inches(2.28))
+    _add_chart(slide, charts_dir, "urgency_heatmap_INC", Inches(10.51), Inches(0.43), Inches(2.77), Inches(2.15))
+    _add_chart(slide, charts_dir, "urgency_heatmap_RITM", Inches(5.44), Inches(0.48), Inches(2.64), Inches(2.05))
+    _add_chart(slide, charts_dir, "donut_total", Inches(8.03), Inches(0.43), Inches(2.51), Inches(2.28))
 
     keynotes_box = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(0.76), Inches(2.68), Inches(4.03), Inches(3.75))
     keynotes_box.fill.solid()
@@ -74,7 +123,7 @@ def add_summary_slide(prs, data, overall):
     keynotes_box.text_frame.paragraphs[0].font.size = Pt(14)
     keynotes_box.text_frame.paragraphs[0].font.bold = True
 
-def add_insights_slide(prs, summary):
+def add_insights_slide(prs, summary, charts_dir="data/charts"):
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(12), Inches(1))
@@ -85,6 +134,7 @@ def add_insights_slide(prs, summary):
 
     comparison = summary.get("comparison", {})
     insights_box = slide.shapes.add_textbox(Inches(0.5), Inches(1.1), Inches(6), Inches(3.5))
+    insights_box.name = INSIGHTS_SHAPE
     insights_tf = insights_box.text_frame
     insights_tf.word_wrap = True
     for key, line in comparison.items():
@@ -94,33 +144,168 @@ def add_insights_slide(prs, summary):
     if insights_tf.paragraphs:
         insights_tf.paragraphs[0].font.bold = True
 
-    if Path("data/charts/volume_by_service.png").exists():
-        slide.shapes.add_picture("data/charts/volume_by_service.png", Inches(7), Inches(1.1), height=Inches(3.0))
+    _add_chart(slide, charts_dir, "volume_by_service", Inches(7), Inches(1.1), height=Inches(3.0))
+    _add_chart(slide, charts_dir, "monthly_progress", Inches(0.5), Inches(4.7), height=Inches(2.5))
 
-    if Path("data/charts/monthly_progress.png").exists():
-        slide.shapes.add_picture("data/charts/monthly_progress.png", Inches(0.5), Inches(4.7), height=Inches(2.5))
+def _set_paragraph_text(paragraph, text):
+    """Replace a paragraph's text, keeping the formatting of its first run"""
+    runs = paragraph.runs
+    if not runs:
+        paragraph.text = text
+        return
+    runs[0].text = text
+    for run in runs[1:]:
+        run._r.getparent().remove(run._r)
 
-def generate_ppt(json_path: str, output_dir: str):
-    with open(json_path, 'r') as f:
-        summary = json.load(f)
+def _fill_table(table, data):
+    """Fill the template table's body in place, header row and cell formatting untouched"""
+    for row, values in zip(list(table.rows)[1:], service_rows(data)):
+        for cell, value in zip(row.cells, values):
+            _set_paragraph_text(cell.text_frame.paragraphs[0], value)
+
+def _fill_insights(text_frame, comparison):
+    """After the first paragraph (a heading, empty in the default layout), one '- line' paragraph
+    per comparison, formatted like the template's last paragraph"""
+    template = text_frame.paragraphs[-1]._p
+    for paragraph in text_frame.paragraphs[1:]:
+        paragraph._p.getparent().remove(paragraph._p)
+    anchor = text_frame.paragraphs[0]._p
+    for _ in comparison:
+        anchor.addnext(copy.deepcopy(template))
+    for paragraph, line in zip(text_frame.paragraphs[1:], comparison.values()):
+        _set_paragraph_text(paragraph, f"- {line}")
+
+def _swap_image(picture, path):
+    """Point a template picture at the chart at path; it keeps its position, size and cropping"""
+    slide_part = picture.part
+    blip = picture._element.blipFill.blip
+    old_rid = blip.rEmbed
+    _, rid = slide_part.get_or_add_image_part(image_stream(path, picture.width, picture.height))
+    blip.rEmbed = rid
+    _drop_unused_image(slide_part, old_rid)
 
+def _remove_picture(picture):
+    slide_part = picture.part
+    rid = picture._element.blipFill.blip.rEmbed
+    picture._element.getparent().remove(picture._element)
+    _drop_unused_image(slide_part, rid)
+
+def _drop_unused_image(slide_part, rid):
+    """Drop the slide's relationship to an image no picture shows any more, so it is not saved"""
+    # Part.drop_rel only counts r:id references, pictures refer to their image with r:embed
+    if not slide_part._element.xpath(f'//@r:embed[.="{rid}"] | //@r:id[.="{rid}"]'):
+        slide_part.rels.pop(rid)
+
+def fill_template(prs, summary, charts_dir="data/charts"):
+    """Fill the named shapes of a template deck in one pass over its slides.
+
+    The services table and the insights text keep the template's
+    formatting, and every chart:<name> picture gets <name>.png from
+    charts_dir in place of its placeholder image (or is removed when the
+    chart was not drawn). Everything else in the template stays as is.
+    """
+    data = summary.get("services", {})
+    charts_dir = Path(charts_dir)
+    for slide in prs.slides:
+        for shape in list(slide.shapes):
+            if shape.name == TABLE_SHAPE and shape.has_table:
+                _fill_table(shape.table, data)
+            elif shape.name == INSIGHTS_SHAPE and shape.has_text_frame:
+                _fill_insights(shape.text_frame, summary.get("comparison", {}))
+            elif shape.name.startswith(CHART_SHAPE) and shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+                path = charts_dir / f"{shape.name[len(CHART_SHAPE):]}.png"
+                if path.exists():
+                    _swap_image(shape, path)
+                else:
+                    _remove_picture(shape)
+    return prs
+
+def build_template(path):
+    """Save the default layout as a template deck, with grey placeholder images for the charts"""
+    from PIL import Image
+    path = Path(path)
+    with tempfile.TemporaryDirectory() as charts_dir:
+        for name, (width, height) in CHARTS.items():
+            Image.new("RGB", (round(width * 10), round(height * 10)), "lightgrey").save(Path(charts_dir) / f"{name}.png")
+        prs = Presentation()
+        add_summary_slide(prs, {}, {}, charts_dir)
+        # One sample line gives the insights box its line formatting
+        add_insights_slide(prs, {"comparison": {"SERVICE": "Change in SERVICE"}}, charts_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    prs.save(path)
+    print(f"[OK] Presentation template saved to {path}")
+    return path
+
+def _template_bytes(template):
+    """Template deck contents; pass bytes to open the same template for many reports without re-reading it"""
+    if template is None or isinstance(template, bytes):
+        return template
+    return Path(template).read_bytes()
+
+@timed("presentation")
+def write_presentation(summary: dict, output_dir: str, charts_dir: str = "data/charts", template=None,
+                       name: str = "Service_Report"):
+    """Build the report deck from an in-memory summary dict.
+
+    With template (a .pptx path or its bytes) the template's named shapes
+    are filled instead of building the slides from scratch.
+    """
     data = summary.get("services", {})
     overall = summary.get("overall", {})
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    prs = Presentation()
-    add_summary_slide(prs, data, overall)
-    add_insights_slide(prs, summary)
+    template = _template_bytes(template)
+    if template is not None:
+        prs = fill_template(Presentation(io.BytesIO(template)), summary, charts_dir)
+    else:
+        prs = Presentation()
+        add_summary_slide(prs, data, overall, charts_dir)
+        add_insights_slide(prs, summary, charts_dir)
 
-    ppt_path = output_path / "Service_Report.pptx"
+    ppt_path = output_path / f"{name}.pptx"
     prs.save(ppt_path)
     print(f"[OK] Presentation saved to {ppt_path}")
+    return ppt_path
+
+def write_reports(reports: dict, output_dir: str, charts_dir: str = "data/charts", template=None):
+    """Write one deck per named summary (business unit, date range, ...) in this process.
+
+    Charts for report <name> are read from charts_dir/<name> when that
+    directory exists, else from charts_dir. The template is read once.
+    """
+    template = _template_bytes(template)
+    paths = {}
+    for name, summary in reports.items():
+        report_charts = Path(charts_dir) / name
+        paths[name] = write_presentation(summary, output_dir, report_charts if report_charts.is_dir() else charts_dir,
+                                         template, name=f"Service_Report_{name}")
+    return paths
+
+def generate_ppt(json_path: str, output_dir: str, charts_dir: str = "data/charts", template: str = None):
+    with open(json_path, 'r') as f:
+        summary = json.load(f)
+
+    return write_presentation(summary, output_dir, charts_dir, template)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate service report PowerPoint")
-    parser.add_argument("--input", required=True, help="Path to JSON summary file")
-    parser.add_argument("--output", required=True, help="Directory to save PPT")
+    parser.add_argument("--input", nargs="+", help="Path to JSON summary file (several write one report each)")
+    parser.add_argument("--output", help="Directory to save PPT")
+    parser.add_argument("--charts-dir", default="data/charts", help="Directory of the chart PNGs")
+    parser.add_argument("--template", help="Fill this .pptx template instead of building the slides")
+    parser.add_argument("--build-template", help="Save the default layout as a template to this path and exit")
     args = parser.parse_args()
 
-    generate_ppt(args.input, args.output)
+    if args.build_template:
+        build_template(args.build_template)
+    elif not args.input or not args.output:
+        parser.error("--input and --output are required")
+    elif len(args.input) == 1:
+        generate_ppt(args.input[0], args.output, args.charts_dir, args.template)
+    else:
+        reports = {}
+        for json_path in args.input:
+            with open(json_path, 'r') as f:
+                reports[re.sub(r"\W", "_", Path(json_path).stem)] = json.load(f)
+        write_reports(reports, args.output, args.charts_dir, args.template)
@@ -1,27 +1,16 @@
-import pandas as pd
-from dateutil import parser
+import sys
 from pathlib import Path
 
-def safe_parse(x):
-    try:
-        return parser.parse(str(x), fuzzy=True)
-    except Exception:
-        return pd.NaT
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+from utils.dates import parse_dates
+from utils.loaders import load_csv
 
 def clean_file(input_file, output_file):
-    encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252']
-    df = None
-    for enc in encodings:
-        try:
-            print(f"🔍 Trying to read {input_file} with encoding: {enc}")
-            df = pd.read_csv(input_file, encoding=enc, dtype=str, low_memory=False)
-            print(f"✅ Loaded {len(df)} rows with {enc}")
-            break
-        except Exception as e:
-            print(f"❌ Failed with {enc}: {e}")
-    
-    if df is None:
-        print("❌ All encoding attempts failed.")
+    try:
+        df = load_csv(input_file, dtype=str, low_memory=False)
+        print(f"✅ Loaded {len(df)} rows")
+    except Exception as e:
+        print(f"❌ Failed to read {input_file}: {e}")
         return
 
     if 'Created' not in df.columns:
@@ -29,7 +18,7 @@ def clean_file(input_file, output_file):
         return
 
     df["Created_raw"] = df["Created"]
-    df["Created"] = df["Created"].apply(safe_parse)
+    df["Created"] = parse_dates(df["Created"])
     failed_count = df["Created"].isna().sum()
     print(f"✅ Parsed 'Created' for {len(df)} rows. Failed: {failed_count}")
 